@@ -1,5 +1,18 @@
 from django.contrib import admin
-from .models import CrimeData
+from .models import CrimeData, State
+
+
+@admin.register(State)
+class StateAdmin(admin.ModelAdmin):
+    """
+    Admin interface configuration for the State dimension table.
+    """
+
+    list_display = ['name', 'abbreviation', 'id']
+
+    search_fields = ['name', 'abbreviation']
+
+    readonly_fields = ['lookup_key']
 
 
 @admin.register(CrimeData)
@@ -16,9 +29,11 @@ class CrimeDataAdmin(admin.ModelAdmin):
 
     list_filter = ['year', 'state']
 
-    search_fields = ['state', 'year']
+    list_select_related = ['state']
+
+    search_fields = ['state__name', 'year']
 
-    ordering = ['-year', 'state']
+    ordering = ['-year', 'state__name']
 
     fieldsets = (
         ('Basic Information', {
@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class CrimeApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'crime_api'
+
+    def ready(self):
+        """
+        Rebuild the in-memory state resolver whenever a State row changes, and
+        move to a new dataset version once per transaction that changes crime
+        data or states.
+        """
+        from .cache import schedule_dataset_version_bump
+        from .models import CrimeData, State
+        from .resolver import invalidate_state_resolver
+
+        post_save.connect(invalidate_state_resolver, sender=State, dispatch_uid='state_resolver_save')
+        post_delete.connect(invalidate_state_resolver, sender=State, dispatch_uid='state_resolver_delete')
+        for model in (CrimeData, State):
+            uid = f'dataset_version_{model.__name__}'
+            post_save.connect(schedule_dataset_version_bump, sender=model, dispatch_uid=f'{uid}_save')
+            post_delete.connect(schedule_dataset_version_bump, sender=model, dispatch_uid=f'{uid}_delete')
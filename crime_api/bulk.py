@@ -0,0 +1,145 @@
+"""
+Batch writes of crime records.
+
+Writing records one request at a time costs a request, a unique
+(state, year) lookup and an INSERT or UPDATE per record. These helpers
+validate a whole batch in one pass, check existing (state, year) pairs
+with one query, resolve states and write with a single bulk statement per
+batch inside one transaction, and invalidate cached responses
+and engine snapshots once for the whole batch.
+
+Bulk writes do not send post_save, so row_hash is set here and the
+dataset version is bumped explicitly.
+"""
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from .cache import bump_dataset_version
+from .ingest import MODEL_FIELDS
+from .models import CrimeData, State, state_lookup_key
+from .serializers import DUPLICATE_RECORD_MESSAGE, CrimeDataBulkSerializer
+
+# Fields a bulk update may change; state and year only address the record
+UPDATE_FIELDS = [field for field in MODEL_FIELDS if field not in ('state', 'year')]
+
+
+def bulk_create_records(records):
+    """
+    Validate and insert a list of record dicts.
+
+    Valid records are inserted together; the others are left out. Returns
+    (created CrimeData objects, {record index: error detail}).
+    """
+    errors = {}
+    valid = []
+    validator = CrimeDataBulkSerializer()
+    for index, record in enumerate(records):
+        try:
+            valid.append((index, validator.run_validation(record)))
+        except ValidationError as exc:
+            errors[index] = exc.detail
+
+    # Pairs already stored, plus those claimed by earlier records of the batch
+    keys = {index: (state_lookup_key(data['state']), data['year']) for index, data in valid}
+    taken = set(
+        CrimeData.objects.filter(
+            state__lookup_key__in={key[0] for key in keys.values()},
+            year__in={key[1] for key in keys.values()},
+        ).values_list('state__lookup_key', 'year')
+    )
+
+    accepted = []
+    for index, data in valid:
+        if keys[index] in taken:
+            errors[index] = {'non_field_errors': [DUPLICATE_RECORD_MESSAGE]}
+            continue
+        taken.add(keys[index])
+        accepted.append(data)
+
+    objects = []
+    if accepted:
+        # New states are created in the same transaction as the rows, so a
+        # batch that fails to insert leaves no State rows behind
+        with transaction.atomic():
+            states = State.objects.get_for_names({data['state'] for data in accepted})
+            for data in accepted:
+                record = CrimeData(**{**data, 'state': states[data['state']]})
+                record.row_hash = record.compute_row_hash()
+                objects.append(record)
+            CrimeData.objects.bulk_create(objects)
+        bump_dataset_version()
+    return objects, errors
+
+
+def bulk_update_records(updates):
+    """
+    Apply a list of {state, year, field: value, ...} corrections.
+
+    Only the given fields are validated, then the cross-field checks are
+    re-run on the record's values with the corrections applied. Updates to
+    the same record are applied in order. Accepted changes are written with
+    one bulk_update of just the touched fields. Returns (updated CrimeData
+    objects, {update index: error detail}).
+    """
+    errors = {}
+    valid = []
+    validator = CrimeDataBulkSerializer(partial=True)
+    for index, update in enumerate(updates):
+        if not isinstance(update, dict):
+            errors[index] = {'non_field_errors': ['Expected an object with state, year and the fields to change.']}
+            continue
+        missing = {field: ['This field is required.'] for field in ('state', 'year') if field not in update}
+        changes = set(update) - {'state', 'year'}
+        unknown = sorted(changes - set(UPDATE_FIELDS))
+        if missing:
+            errors[index] = missing
+            continue
+        if unknown or not changes:
+            message = f"Unknown fields: {', '.join(unknown)}." if unknown else 'No fields to update.'
+            errors[index] = {'non_field_errors': [message]}
+            continue
+        try:
+            valid.append((index, validator.run_validation(update)))
+        except ValidationError as exc:
+            errors[index] = exc.detail
+
+    states = State.objects.get_for_names({data['state'] for _, data in valid}, create=False)
+    records = {
+        (record.state_id, record.year): record
+        for record in CrimeData.objects.select_related('state').filter(
+            state_id__in={state.id for state in states.values()},
+            year__in={data['year'] for _, data in valid},
+        )
+    }
+
+    touched = set()
+    updated = {}
+    for index, data in valid:
+        name, year = data.pop('state'), data.pop('year')
+        state = states.get(name)
+        record = records.get((state.id, year)) if state else None
+        if record is None:
+            errors[index] = {'non_field_errors': [f'No record found for {name} in {year}.']}
+            continue
+
+        values = {field: getattr(record, field) for field in UPDATE_FIELDS}
+        values.update(data)
+        try:
+            validator.validate(values)
+        except ValidationError as exc:
+            errors[index] = as_serializer_error(exc)
+            continue
+
+        for field, value in data.items():
+            setattr(record, field, value)
+        touched.update(data)
+        updated[record.id] = record
+
+    if updated:
+        for record in updated.values():
+            record.row_hash = record.compute_row_hash()
+        with transaction.atomic():
+            CrimeData.objects.bulk_update(updated.values(), sorted(touched) + ['row_hash'])
+        bump_dataset_version()
+    return list(updated.values()), errors
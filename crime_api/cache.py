@@ -0,0 +1,213 @@
+"""
+Response cache for the analytical endpoints, invalidated by a dataset version.
+
+The crime data only changes when it is loaded or written through the API,
+so analytical responses are cached under a key built from the endpoint,
+its normalized parameters and the current dataset version. Every write
+bumps the version, which makes all earlier entries unreachable; they then
+age out of the cache backend on their own.
+
+Responses live in Django's default cache and may be evicted at any time.
+The version and the hit/miss counters live in the separate DATASET_CACHE
+alias, which holds only those few keys, so it never fills up and culls the
+version; losing it would drop every cached response and ETag, rebuild the
+state resolver and reload the engine snapshot. Both caches must be shared
+by all worker processes.
+"""
+import functools
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.response import Response
+
+from .states import normalize_state_key
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Cache alias holding the dataset version and the hit/miss counters
+DATASET_CACHE = 'dataset'
+COUNTER_LOCK = '.counters.lock'
+
+VERSION_KEY = 'crime_api:dataset_version'
+RESPONSE_KEY_PREFIX = 'crime_api:response'
+COUNTER_KEY_PREFIX = 'crime_api:cache_stats'
+
+# Endpoints wrapped with cached_response, in registration order
+CACHED_ENDPOINTS = []
+
+# Parameters holding a state name, or a comma-separated list of them
+STATE_PARAMETERS = {'state_name'}
+STATE_LIST_PARAMETERS = {'states'}
+
+
+def dataset_cache():
+    """Return the cache holding the dataset version and the hit/miss counters."""
+    return caches[DATASET_CACHE]
+
+
+def get_dataset_version():
+    """Return the current dataset version, starting one if none is stored."""
+    store = dataset_cache()
+    version = store.get(VERSION_KEY)
+    if version is None:
+        store.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = store.get(VERSION_KEY)
+    return version
+
+
+def bump_dataset_version():
+    """
+    Move to a new dataset version so cached responses go stale.
+
+    Versions are nanosecond timestamps, never lower than the previous value
+    plus one, so a restarted cache cannot reuse an old version.
+    """
+    store = dataset_cache()
+    current = store.get(VERSION_KEY) or 0
+    version = max(time.time_ns(), current + 1)
+    store.set(VERSION_KEY, version, timeout=None)
+    return version
+
+
+def bump_dataset_version_on_commit():
+    """on_commit callback queued by schedule_dataset_version_bump."""
+    bump_dataset_version()
+
+
+def schedule_dataset_version_bump(using=None, **kwargs):
+    """
+    Bump the dataset version once, when the current transaction commits.
+
+    Signal receiver for model writes. A transaction that writes many rows
+    bumps the version only once, and one that is rolled back leaves it
+    alone. The pending flag is the queued callback itself: Django drops it
+    from the connection's on_commit queue on commit or rollback.
+    """
+    connection = transaction.get_connection(using or DEFAULT_DB_ALIAS)
+    pending = connection.in_atomic_block and any(
+        callback[1] is bump_dataset_version_on_commit for callback in connection.run_on_commit
+    )
+    if not pending:
+        transaction.on_commit(bump_dataset_version_on_commit, using=connection.alias)
+
+
+def normalize_parameters(request, view_kwargs):
+    """
+    Return a canonical, order-independent form of a request's parameters.
+
+    State names are case-folded and state lists are de-duplicated and
+    sorted, so equivalent requests share one cache entry.
+    """
+    parameters = {}
+    for name, value in view_kwargs.items():
+        parameters[name] = normalize_state_key(value) if name in STATE_PARAMETERS else str(value)
+    for name, values in request.query_params.lists():
+        value = ','.join(values)
+        if name in STATE_LIST_PARAMETERS:
+            value = ','.join(sorted({normalize_state_key(state) for state in value.split(',')} - {''}))
+        elif name in STATE_PARAMETERS:
+            value = normalize_state_key(value)
+        else:
+            value = value.strip()
+        parameters[name] = value
+    return sorted(parameters.items())
+
+
+def response_cache_key(endpoint, request, view_kwargs, version):
+    """Build the cache key for one endpoint, parameter set and dataset version."""
+    digest = hashlib.blake2b(
+        repr(normalize_parameters(request, view_kwargs)).encode(), digest_size=16
+    ).hexdigest()
+    return f'{RESPONSE_KEY_PREFIX}:{endpoint}:{version}:{digest}'
+
+
+@contextmanager
+def counter_lock(store):
+    """
+    Serialize counter updates on the file backend.
+
+    FileBasedCache.incr is a plain get and set, so concurrent requests
+    would lose updates; they take an exclusive lock file in the cache
+    directory instead. Other backends increment atomically.
+    """
+    if not isinstance(store, FileBasedCache) or fcntl is None:
+        yield
+        return
+    directory = settings.CACHES[DATASET_CACHE]['LOCATION']
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, COUNTER_LOCK), 'a') as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def record_lookup(endpoint, outcome):
+    """Increment the hit or miss counter for an endpoint."""
+    key = f'{COUNTER_KEY_PREFIX}:{endpoint}:{outcome}'
+    store = dataset_cache()
+    with counter_lock(store):
+        store.add(key, 0, timeout=None)
+        try:
+            store.incr(key)
+        except ValueError:
+            # Cleared between add and incr; start counting again
+            store.set(key, 1, timeout=None)
+
+
+def cache_statistics():
+    """Return {endpoint: {'hits': n, 'misses': n}} for every cached endpoint."""
+    keys = [
+        f'{COUNTER_KEY_PREFIX}:{endpoint}:{outcome}'
+        for endpoint in CACHED_ENDPOINTS
+        for outcome in ('hits', 'misses')
+    ]
+    counts = dataset_cache().get_many(keys)
+    return {
+        endpoint: {
+            outcome: counts.get(f'{COUNTER_KEY_PREFIX}:{endpoint}:{outcome}', 0)
+            for outcome in ('hits', 'misses')
+        }
+        for endpoint in CACHED_ENDPOINTS
+    }
+
+
+def cached_response(endpoint):
+    """
+    Cache successful responses of a function-based API view.
+
+    Apply below @api_view so the wrapped function receives the DRF request.
+    Only 200 responses are stored; errors are recomputed every time, and
+    streamed results are too large to be worth holding in the cache.
+    """
+    def decorator(view):
+        CACHED_ENDPOINTS.append(endpoint)
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            version = get_dataset_version()
+            key = response_cache_key(endpoint, request, kwargs, version)
+            data = cache.get(key)
+            if data is not None:
+                record_lookup(endpoint, 'hits')
+                return Response(data)
+
+            record_lookup(endpoint, 'misses')
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, response.data, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+            return response
+
+        return wrapper
+
+    return decorator
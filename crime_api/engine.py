@@ -0,0 +1,383 @@
+"""
+Optional in-process columnar engine for the analytical endpoints.
+
+The dataset is a dense state x year cube of a few thousand rows, so it fits
+comfortably in memory as NumPy column arrays. When an endpoint is switched
+to the 'numpy' engine, its filters, top-k sorts, trends and groupings run
+as vectorized array operations on that snapshot instead of going through
+the ORM. The snapshot is tagged with the dataset version and reloaded on
+first use after any write.
+
+With ENGINE_SNAPSHOT_DIR set (ideally on tmpfs such as /dev/shm), the
+snapshot is written once as .npy files and every worker process memory-maps
+them instead of holding its own copy; see attach_shared_dataset.
+
+NumPy is an optional dependency; it is only imported by this module and
+only required when an endpoint is configured to use the engine.
+"""
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .cache import get_dataset_version
+from .ingest import FLOAT_FIELDS, MODEL_FIELDS
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+ENGINE_ORM = 'orm'
+ENGINE_NUMPY = 'numpy'
+ENGINES = (ENGINE_ORM, ENGINE_NUMPY)
+
+# Endpoints with a columnar implementation, as named in ANALYTICS_ENGINES
+ENGINE_ENDPOINTS = (
+    'high_crime_states', 'crime_trends', 'compare_states', 'safest_states',
+    'decade_comparison', 'decade_comparison_all', 'crime_type_analysis', 'crime_matrix',
+)
+
+# Columns held in memory: every stored number, keyed as in the model
+COLUMNS = ['id', 'state_id'] + [field for field in MODEL_FIELDS if field != 'state'] + [
+    'total_crimes', 'crime_rate_per_capita',
+]
+FLOAT_COLUMNS = set(FLOAT_FIELDS) | {'crime_rate_per_capita'}
+
+# Files inside ENGINE_SNAPSHOT_DIR
+SNAPSHOT_META = 'meta.json'
+SNAPSHOT_LINK = 'current'
+SNAPSHOT_LOCK = '.lock'
+
+
+def engine_for(endpoint):
+    """
+    Return the engine configured for an endpoint.
+
+    ANALYTICS_ENGINES overrides the ANALYTICS_ENGINE default per endpoint.
+    """
+    engine = getattr(settings, 'ANALYTICS_ENGINES', {}).get(
+        endpoint, getattr(settings, 'ANALYTICS_ENGINE', ENGINE_ORM)
+    )
+    if engine not in ENGINES:
+        raise ImproperlyConfigured(f"Unknown analytics engine for {endpoint}: {engine!r}")
+    if engine == ENGINE_NUMPY and np is None:
+        raise ImproperlyConfigured(f"The numpy engine is configured for {endpoint} but NumPy is not installed.")
+    return engine
+
+
+def numpy_engine_in_use():
+    """Return True if any endpoint is configured to use the numpy engine."""
+    return any(engine_for(endpoint) == ENGINE_NUMPY for endpoint in ENGINE_ENDPOINTS)
+
+
+class ColumnarDataset:
+    """
+    Snapshot of all CrimeData rows as NumPy columns.
+
+    Rows are stored sorted by (state name, year), so each state's rows form
+    one contiguous slice. A second index orders rows by (-year, state name),
+    the model's default ordering.
+    """
+
+    def __init__(self, columns, state_names, version=None):
+        """
+        Wrap already-sorted arrays: the COLUMNS plus the 'state_rank' and
+        'default_order' indexes. The arrays may be memory-mapped.
+        """
+        self.version = version
+        self.state_names = state_names
+        self.columns = columns
+        self.year = columns['year']
+        self.state_rank = columns['state_rank']
+        self.default_order = columns['default_order']
+
+        # Contiguous [start, end) slice of each state's rows
+        self.state_slices = {}
+        if len(self.year):
+            starts = [0] + (np.flatnonzero(np.diff(self.state_rank)) + 1).tolist()
+            for start, end in zip(starts, starts[1:] + [len(self.year)]):
+                self.state_slices[int(columns['state_id'][start])] = (start, end)
+
+    @classmethod
+    def from_rows(cls, rows, state_names, version=None):
+        """Build the columns and indexes from value tuples in COLUMNS order."""
+        ranks = {state_id: rank for rank, state_id in enumerate(sorted(state_names, key=state_names.get))}
+        rows = sorted(rows, key=lambda row: (ranks[row[1]], row[2]))
+
+        columns = {}
+        for position, field in enumerate(COLUMNS):
+            dtype = np.float64 if field in FLOAT_COLUMNS else np.int64
+            columns[field] = np.array([row[position] for row in rows], dtype=dtype)
+        columns['state_rank'] = np.array([ranks[row[1]] for row in rows], dtype=np.int64)
+        columns['default_order'] = np.lexsort((columns['state_rank'], -columns['year']))
+        return cls(columns, state_names, version)
+
+    @classmethod
+    def load(cls, version=None):
+        """Read every CrimeData row in one query."""
+        from .models import CrimeData, State
+
+        rows = list(CrimeData.objects.values_list(*COLUMNS))
+        state_names = dict(State.objects.values_list('id', 'name'))
+        return cls.from_rows(rows, state_names, version)
+
+    def save(self, directory):
+        """Write one .npy file per array plus a metadata file into directory."""
+        os.makedirs(directory)
+        for name, array in self.columns.items():
+            np.save(os.path.join(directory, f'{name}.npy'), array)
+        with open(os.path.join(directory, SNAPSHOT_META), 'w', encoding='utf-8') as file:
+            json.dump({'version': self.version, 'state_names': self.state_names}, file)
+
+    @classmethod
+    def open(cls, directory):
+        """Attach to a saved snapshot; arrays are memory-mapped read-only, not copied."""
+        with open(os.path.join(directory, SNAPSHOT_META), encoding='utf-8') as file:
+            meta = json.load(file)
+        columns = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+            for name in COLUMNS + ['state_rank', 'default_order']
+        }
+        state_names = {int(state_id): name for state_id, name in meta['state_names'].items()}
+        return cls(columns, state_names, meta['version'])
+
+    def __len__(self):
+        return len(self.year)
+
+    def records(self, indices, fields):
+        """
+        Return row dicts with the given fields for the given row indices.
+
+        Values are converted to Python ints and floats and 'state' to the
+        state name, matching the ORM serializers' output.
+        """
+        values = []
+        for field in fields:
+            if field == 'state':
+                names = self.state_names
+                values.append([names[state_id] for state_id in self.columns['state_id'][indices].tolist()])
+            else:
+                values.append(self.columns[field][indices].tolist())
+        return [dict(zip(fields, row)) for row in zip(*values)]
+
+    def year_rows(self, year):
+        """Return the indices of one year's rows, ordered by state name."""
+        return np.flatnonzero(self.year == int(year))
+
+    def threshold(self, field, minimum, year=None):
+        """Return rows with field >= minimum, in the default (-year, state) order."""
+        order = self.default_order
+        mask = self.columns[field][order] >= minimum
+        if year is not None:
+            mask &= self.year[order] == int(year)
+        return order[mask]
+
+    def top(self, indices, field, limit, descending=False):
+        """Return the first limit of indices sorted by field; ties keep their order."""
+        keys = self.columns[field][indices]
+        order = np.argsort(-keys if descending else keys, kind='stable')
+        return indices[order[:limit]]
+
+    def state_rows(self, state_id, year_from=None, year_to=None):
+        """Return one state's rows in year order, optionally limited to a year range."""
+        start, end = self.state_slices.get(state_id, (0, 0))
+        indices = np.arange(start, end)
+        if year_from is not None:
+            indices = indices[self.year[indices] >= int(year_from)]
+        if year_to is not None:
+            indices = indices[self.year[indices] <= int(year_to)]
+        return indices
+
+    def compare(self, state_ids, year):
+        """Return the rows of the given states in one year, ordered by state name."""
+        indices = self.year_rows(year)
+        return indices[np.isin(self.columns['state_id'][indices], list(state_ids))]
+
+    def matrix_rows(self, field, state_ids=None, year_from=None, year_to=None):
+        """
+        Return (state name, year, value) triples of one field, ordered by
+        state name and year, optionally limited to some states and years.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if state_ids is not None:
+            mask &= np.isin(self.columns['state_id'], list(state_ids))
+        if year_from is not None:
+            mask &= self.year >= int(year_from)
+        if year_to is not None:
+            mask &= self.year <= int(year_to)
+        indices = np.flatnonzero(mask)
+        names = self.state_names
+        return list(zip(
+            [names[state_id] for state_id in self.columns['state_id'][indices].tolist()],
+            self.year[indices].tolist(),
+            self.columns[field][indices].tolist(),
+        ))
+
+    def trend_statistics(self, indices):
+        """
+        Equivalent of views.trend_statistics over the given rows.
+
+        Averages are summed sequentially rather than with NumPy's pairwise
+        summation, so they match the ORM path to the last bit.
+        """
+        count = len(indices)
+        violent = self.columns['violent_rate_all'][indices]
+        return {
+            'avg_violent_rate': sum(violent.tolist()) / count,
+            'avg_property_rate': sum(self.columns['property_rate_all'][indices].tolist()) / count,
+            'max_violent_rate': float(violent.max()),
+            'min_violent_rate': float(violent.min()),
+            'total_murders': int(self.columns['violent_total_murder'][indices].sum()),
+            'avg_population': sum(self.columns['population'][indices].tolist()) / count,
+        }
+
+    def bucket_groups(self, width, state_id=None):
+        """
+        Group rows by state and year bucket of the given width.
+
+        Returns (state name, bucket start, stats) tuples ordered by state name
+        and bucket, with the same statistics as views.bucket_statistics.
+        """
+        if state_id is None:
+            indices = np.arange(len(self))
+        else:
+            indices = self.state_rows(state_id)
+        if not len(indices):
+            return []
+
+        buckets = self.year[indices] // width * width
+        keys, inverse, counts = np.unique(
+            self.state_rank[indices] * 100000 + buckets, return_inverse=True, return_counts=True
+        )
+
+        def group_sum(field):
+            return np.bincount(inverse, weights=self.columns[field][indices])
+
+        violent = group_sum('violent_rate_all') / counts
+        property_ = group_sum('property_rate_all') / counts
+        murders = np.bincount(inverse, weights=self.columns['violent_total_murder'][indices])
+        population = group_sum('population') / counts
+        first_rows = indices[np.unique(inverse, return_index=True)[1]]
+        state_ids = self.columns['state_id'][first_rows].tolist()
+
+        return [
+            (self.state_names[state_ids[group]], int(keys[group] % 100000), {
+                'avg_violent_rate': float(violent[group]),
+                'avg_property_rate': float(property_[group]),
+                'total_murders': int(round(murders[group])),
+                'avg_population': float(population[group]),
+                'years_included': int(counts[group]),
+            })
+            for group in range(len(keys))
+        ]
+
+
+_dataset = None
+_dataset_lock = threading.Lock()
+
+
+def get_dataset():
+    """
+    Return the snapshot for the current dataset version, reloading it after writes.
+
+    With ENGINE_SNAPSHOT_DIR set, the snapshot is shared between processes
+    through memory-mapped files; otherwise each process loads its own copy.
+    """
+    global _dataset
+    version = get_dataset_version()
+    dataset = _dataset
+    if dataset is None or dataset.version != version:
+        with _dataset_lock:
+            if _dataset is None or _dataset.version != version:
+                directory = getattr(settings, 'ENGINE_SNAPSHOT_DIR', None)
+                if directory:
+                    _dataset = attach_shared_dataset(directory, version)
+                else:
+                    _dataset = ColumnarDataset.load(version)
+            dataset = _dataset
+    return dataset
+
+
+def open_current_snapshot(directory):
+    """Attach to the snapshot the 'current' link points at, or return None."""
+    try:
+        return ColumnarDataset.open(os.path.join(directory, os.readlink(os.path.join(directory, SNAPSHOT_LINK))))
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+
+
+@contextmanager
+def snapshot_lock(directory):
+    """Hold an exclusive lock on the snapshot directory so one process builds at a time."""
+    with open(os.path.join(directory, SNAPSHOT_LOCK), 'a') as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def attach_shared_dataset(directory, version):
+    """
+    Attach to the shared snapshot for version, building it if needed.
+
+    The first process to notice a stale snapshot builds the new one under
+    the lock; the others wait and then attach to its files. Pages are
+    shared through the OS page cache, so memory stays flat as workers are
+    added, and a new worker attaches without querying the database.
+    """
+    dataset = open_current_snapshot(directory)
+    if dataset is not None and dataset.version == version:
+        return dataset
+
+    os.makedirs(directory, exist_ok=True)
+    with snapshot_lock(directory):
+        dataset = open_current_snapshot(directory)
+        if dataset is not None and dataset.version == version:
+            return dataset
+        dataset = ColumnarDataset.load(version)
+        publish_snapshot(dataset, directory)
+    # Serve from the shared mapping; fall back to the private copy if a newer
+    # snapshot has already replaced this one
+    return open_current_snapshot(directory) or dataset
+
+
+def publish_snapshot(dataset, directory):
+    """
+    Save a snapshot and atomically point the 'current' link at it.
+
+    The files are written to a private directory and renamed into place,
+    then the link is swapped with os.replace, so readers see either the old
+    or the new snapshot, never a partial one. Older snapshots are removed;
+    processes still mapping them keep their pages until they move on.
+    """
+    name = str(dataset.version)
+    staging = os.path.join(directory, f'.{name}.{os.getpid()}')
+    shutil.rmtree(staging, ignore_errors=True)
+    dataset.save(staging)
+    target = os.path.join(directory, name)
+    shutil.rmtree(target, ignore_errors=True)
+    os.rename(staging, target)
+
+    link = os.path.join(directory, f'.{SNAPSHOT_LINK}.{os.getpid()}')
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(name, link)
+    os.replace(link, os.path.join(directory, SNAPSHOT_LINK))
+
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if entry != name and not entry.startswith('.') and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
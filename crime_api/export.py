@@ -0,0 +1,60 @@
+"""
+Streaming encoders for the bulk export endpoint.
+
+Each encoder takes the output field names and an iterator of row tuples
+(from ValuesRowSerializer.values(...).iterator()) and yields bytes a chunk
+of rows at a time, so an export of any size holds at most one chunk of
+encoded rows in memory.
+"""
+import csv
+import io
+from itertools import islice
+
+from django.utils.text import compress_sequence
+
+from .renderers import encode_json
+
+
+def csv_chunks(fields, rows, chunk_size):
+    """Yield a CSV header line, then CSV lines for chunk_size rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(fields)
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # No rows at all: the header alone
+        yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(fields, rows, chunk_size):
+    """Yield one JSON object per line, chunk_size rows at a time."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield b''.join(encode_json(dict(zip(fields, row))) + b'\n' for row in chunk)
+
+
+# Export format: (encoder, content type, file extension)
+EXPORT_FORMATS = {
+    'csv': (csv_chunks, 'text/csv; charset=utf-8', 'csv'),
+    'ndjson': (ndjson_chunks, 'application/x-ndjson', 'ndjson'),
+}
+
+
+def export_stream(export_format, fields, rows, chunk_size, compress=False):
+    """
+    Return (chunks, content type, filename) for an export.
+
+    With compress, the chunks are gzipped as they are produced and the
+    export is served as a .gz file.
+    """
+    encoder, content_type, extension = EXPORT_FORMATS[export_format]
+    chunks = encoder(fields, rows, chunk_size)
+    filename = f'crime_data.{extension}'
+    if compress:
+        return compress_sequence(chunks), 'application/gzip', f'{filename}.gz'
+    return chunks, content_type, filename
@@ -1,5 +1,6 @@
 from django import forms
-from .models import CrimeData
+from django.db import transaction
+from .models import CrimeData, State, state_lookup_key
 
 
 class CrimeDataForm(forms.ModelForm):
@@ -7,9 +8,12 @@ class CrimeDataForm(forms.ModelForm):
     Form for validating CrimeData input with custom validation rules.
     """
 
+    # Cleaned as a name; the State row is resolved in save(), once the form is valid
+    state = forms.CharField(max_length=100)
+
     class Meta:
         model = CrimeData
-        fields = '__all__'
+        exclude = ['state']
 
     def clean_state(self):
         """Clean and validate state name."""
@@ -53,4 +57,19 @@ class CrimeDataForm(forms.ModelForm):
                     "Property crime totals do not match sum of individual crimes."
                 )
 
+        # The model's unique_together check skips state, which is not a model field here
+        state, year = cleaned_data.get('state'), cleaned_data.get('year')
+        if state and year:
+            duplicates = CrimeData.objects.filter(state__lookup_key=state_lookup_key(state), year=year)
+            if self.instance.pk is not None:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+            if duplicates.exists():
+                raise forms.ValidationError("Crime data with this state and year already exists.")
+
         return cleaned_data
+
+    def save(self, commit=True):
+        """Resolve the State, creating it if new, in the same transaction as the record."""
+        with transaction.atomic():
+            self.instance.state = State.objects.get_for_name(self.cleaned_data['state'])
+            return super().save(commit=commit)
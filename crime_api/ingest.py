@@ -0,0 +1,442 @@
+"""
+CSV parsing helpers for the load_crime_data management command.
+
+Nothing in this module touches the ORM, so the functions can run inside
+worker processes that never set up Django.
+"""
+import bz2
+import csv
+import gzip
+import hashlib
+import io
+import lzma
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from .states import expand_state_name
+
+
+# Model field order used for the tuples exchanged with worker processes
+MODEL_FIELDS = [
+    'state', 'year', 'population',
+    'property_rate_all', 'property_rate_burglary',
+    'property_rate_larceny', 'property_rate_motor',
+    'violent_rate_all', 'violent_rate_assault',
+    'violent_rate_murder', 'violent_rate_rape', 'violent_rate_robbery',
+    'property_total_all', 'property_total_burglary',
+    'property_total_larceny', 'property_total_motor',
+    'violent_total_all', 'violent_total_assault',
+    'violent_total_murder', 'violent_total_rape', 'violent_total_robbery',
+]
+
+
+# Fields stored as floats; every other field except state is an integer
+FLOAT_FIELDS = frozenset(field for field in MODEL_FIELDS if '_rate_' in field)
+
+
+def compute_row_hash(values):
+    """
+    Return a content hash for one record's data fields.
+
+    Values are normalised to their stored type first, so a row parsed from
+    CSV and the same row read back from the database hash identically.
+    """
+    parts = []
+    for field in MODEL_FIELDS:
+        value = values[field]
+        if field in FLOAT_FIELDS:
+            value = float(value)
+        elif field != 'state':
+            value = int(value)
+        parts.append(repr(value))
+    return hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+# Source layouts: model field -> candidate CSV column names, first match wins
+SOURCE_LAYOUTS = {}
+
+# Fields that must resolve to a column for a layout to match a header
+REQUIRED_FIELDS = ('state', 'year', 'population')
+
+
+def register_layout(name, columns, rates_from_totals=False):
+    """
+    Register a CSV source layout under the given name.
+
+    columns maps model fields to candidate column names. Fields with no
+    matching column load as 0. With rates_from_totals, rate fields that have
+    no column are derived per 100,000 population from the matching total.
+    """
+    SOURCE_LAYOUTS[name] = {'columns': columns, 'rates_from_totals': rates_from_totals}
+
+
+# CORGIS State Crime dataset (data/state_crime.csv)
+register_layout('corgis', {
+    'state': ['State'],
+    'year': ['Year'],
+    'population': ['Data.Population'],
+    'property_rate_all': ['Data.Rates.Property.All'],
+    'property_rate_burglary': ['Data.Rates.Property.Burglary'],
+    'property_rate_larceny': ['Data.Rates.Property.Larceny'],
+    'property_rate_motor': ['Data.Rates.Property.Motor'],
+    'violent_rate_all': ['Data.Rates.Violent.All'],
+    'violent_rate_assault': ['Data.Rates.Violent.Assault'],
+    'violent_rate_murder': ['Data.Rates.Violent.Murder'],
+    'violent_rate_rape': ['Data.Rates.Violent.Rape'],
+    'violent_rate_robbery': ['Data.Rates.Violent.Robbery'],
+    'property_total_all': ['Data.Totals.Property.All'],
+    'property_total_burglary': ['Data.Totals.Property.Burglary'],
+    'property_total_larceny': ['Data.Totals.Property.Larceny'],
+    'property_total_motor': ['Data.Totals.Property.Motor'],
+    'violent_total_all': ['Data.Totals.Violent.All'],
+    'violent_total_assault': ['Data.Totals.Violent.Assault'],
+    'violent_total_murder': ['Data.Totals.Violent.Murder'],
+    'violent_total_rape': ['Data.Totals.Violent.Rape'],
+    'violent_total_robbery': ['Data.Totals.Violent.Robbery'],
+})
+
+# Column names matching the model fields, e.g. an export of this API
+register_layout('snake_case', {
+    **{field: [field] for field in MODEL_FIELDS},
+    'state': ['state', 'State'],
+    'year': ['year', 'Year'],
+    'population': ['population', 'Population'],
+})
+
+# FBI UCR estimated crimes export: totals only, states as name or abbreviation
+register_layout('fbi_ucr', {
+    'state': ['state_name', 'state_abbr'],
+    'year': ['year', 'data_year'],
+    'population': ['population'],
+    'property_total_all': ['property_crime'],
+    'property_total_burglary': ['burglary'],
+    'property_total_larceny': ['larceny'],
+    'property_total_motor': ['motor_vehicle_theft'],
+    'violent_total_all': ['violent_crime'],
+    'violent_total_assault': ['aggravated_assault'],
+    'violent_total_murder': ['homicide'],
+    'violent_total_rape': ['rape_legacy', 'rape_revised'],
+    'violent_total_robbery': ['robbery'],
+}, rates_from_totals=True)
+
+
+def to_int(raw):
+    """Convert a CSV value that may be written as a float to int."""
+    return int(float(raw))
+
+
+def converter_for(field):
+    """Return the function that converts a raw CSV string for a model field."""
+    if field == 'state':
+        return expand_state_name
+    if field in FLOAT_FIELDS:
+        return float
+    return to_int
+
+
+def resolve_columns(layout, header):
+    """Map each model field to the positions of its candidate columns in header."""
+    positions = {}
+    for index, name in enumerate(header):
+        positions.setdefault(name.strip(), index)
+    return {
+        field: tuple(positions[name] for name in candidates if name in positions)
+        for field, candidates in layout['columns'].items()
+    }
+
+
+def detect_layout(header):
+    """
+    Return the name of the registered layout that best matches a header.
+
+    A layout matches when all REQUIRED_FIELDS resolve; among matches the one
+    resolving the most fields wins.
+    """
+    best_name, best_score = None, 0
+    for name, layout in SOURCE_LAYOUTS.items():
+        resolved = resolve_columns(layout, header)
+        if not all(resolved.get(field) for field in REQUIRED_FIELDS):
+            continue
+        score = sum(1 for indices in resolved.values() if indices)
+        if score > best_score:
+            best_name, best_score = name, score
+    if best_name is None:
+        raise ValueError(f'CSV header does not match any source layout: {", ".join(SOURCE_LAYOUTS)}')
+    return best_name
+
+
+def compile_getter(indices, convert, default):
+    """Build a function reading one converted field from a row of values."""
+    if not indices:
+        return lambda values: default
+    if len(indices) == 1:
+        index = indices[0]
+
+        def get_single(values):
+            raw = values[index]
+            return convert(raw) if raw else default
+        return get_single
+
+    def get_first(values):
+        for index in indices:
+            raw = values[index]
+            if raw:
+                return convert(raw)
+        return default
+    return get_first
+
+
+def compile_mapper(header, layout_name=None):
+    """
+    Compile a function turning csv.reader rows into value tuples.
+
+    The header is resolved against the layout once, so each row costs one
+    positional lookup and one conversion per field. Tuples are in
+    MODEL_FIELDS order. Returns the layout name used and the mapper.
+    """
+    layout_name = layout_name or detect_layout(header)
+    layout = SOURCE_LAYOUTS[layout_name]
+    resolved = resolve_columns(layout, header)
+    for field in REQUIRED_FIELDS:
+        if not resolved.get(field):
+            raise ValueError(f'Layout {layout_name!r} has no column for required field {field!r}')
+
+    getters = [
+        compile_getter(resolved.get(field, ()), converter_for(field), '' if field == 'state' else 0)
+        for field in MODEL_FIELDS
+    ]
+
+    # (rate position, total position) pairs for rates derived from totals
+    derived = []
+    if layout['rates_from_totals']:
+        derived = [
+            (position, MODEL_FIELDS.index(field.replace('_rate_', '_total_')))
+            for position, field in enumerate(MODEL_FIELDS)
+            if field in FLOAT_FIELDS and not resolved.get(field)
+        ]
+    population_position = MODEL_FIELDS.index('population')
+
+    if not derived:
+        def mapper(values):
+            return tuple([get(values) for get in getters])
+        return layout_name, mapper
+
+    def mapper_with_rates(values):
+        row = [get(values) for get in getters]
+        population = row[population_position]
+        for rate_position, total_position in derived:
+            row[rate_position] = round(row[total_position] * 100000 / population, 1) if population else 0.0
+        return tuple(row)
+    return layout_name, mapper_with_rates
+
+
+# Leading bytes identifying each supported compression format
+COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00',
+}
+
+DECOMPRESSORS = {
+    'gzip': lambda raw: gzip.GzipFile(fileobj=raw),
+    'bz2': bz2.BZ2File,
+    'xz': lzma.LZMAFile,
+}
+
+
+def detect_compression(raw):
+    """Return the compression format of a buffered binary stream, or None."""
+    head = raw.peek(6)[:6]
+    for name, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def is_plain_file(path):
+    """Return True if path is a regular uncompressed file that can be split by byte range."""
+    if path == '-':
+        return False
+    with open(path, 'rb') as raw:
+        return detect_compression(raw) is None
+
+
+@contextmanager
+def open_source(path):
+    """
+    Open a CSV source for streaming text reads.
+
+    '-' reads standard input. gzip, bz2 and xz input is detected from its
+    leading bytes and decompressed on the fly, so nothing is staged on disk.
+    """
+    if path == '-':
+        raw = sys.stdin.buffer
+    else:
+        raw = open(path, 'rb')
+    compression = detect_compression(raw)
+    stream = DECOMPRESSORS[compression](raw) if compression else raw
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        yield text
+    finally:
+        # Detach so standard input is never closed; close what we opened
+        text.detach()
+        if stream is not raw:
+            stream.close()
+        if raw is not sys.stdin.buffer:
+            raw.close()
+
+
+def iter_line_blocks(file, block_size):
+    """Yield blocks of complete lines of roughly block_size characters from a text stream."""
+    while True:
+        lines = file.readlines(block_size)
+        if not lines:
+            return
+        yield ''.join(lines)
+
+
+def file_checksum(path, block_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_header(path):
+    """
+    Return the parsed header columns and the byte offset where data begins.
+    """
+    with open(path, 'rb') as file:
+        header_line = file.readline()
+        data_start = file.tell()
+    header = next(csv.reader([header_line.decode('utf-8-sig')]))
+    return header, data_start
+
+
+def split_byte_ranges(path, start, chunk_size):
+    """
+    Split a file into (start, end) byte ranges aligned to line boundaries.
+
+    Each range ends just after a newline, so no line is split between two
+    chunks. Quoted fields containing embedded newlines are not supported in
+    chunked mode; none of the supported source layouts use them.
+    """
+    file_size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as file:
+        while start < file_size:
+            file.seek(min(start + chunk_size, file_size))
+            file.readline()  # Advance to the end of the current line
+            end = min(file.tell(), file_size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(path, start, end, header, layout_name):
+    """
+    Parse one byte range of an uncompressed CSV file.
+
+    Runs in a worker process; see parse_text for the return value.
+    """
+    started = time.perf_counter()
+    with open(path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    read_time = time.perf_counter() - started
+
+    rows, errors, timings = parse_text(text, header, layout_name, f'Chunk at byte {start}')
+    timings['read'] += read_time
+    return rows, errors, timings
+
+
+def parse_text(text, header, layout_name, label):
+    """
+    Parse a block of CSV lines without a header.
+
+    Runs in a worker process. Returns a list of value tuples in
+    MODEL_FIELDS order, a list of (location, message) errors, and the
+    seconds spent splitting CSV lines ('read') and converting them ('parse').
+    """
+    perf_counter = time.perf_counter
+    _, mapper = compile_mapper(header, layout_name)
+    rows = []
+    errors = []
+    read_time = parse_time = 0.0
+    reader = csv.reader(io.StringIO(text))
+    while True:
+        started = perf_counter()
+        values = next(reader, None)
+        parsed = perf_counter()
+        read_time += parsed - started
+        if values is None:
+            break
+        if not values:
+            continue
+        try:
+            rows.append(mapper(values))
+        except Exception as e:
+            errors.append((f'{label}, line {reader.line_num}', str(e)))
+        parse_time += perf_counter() - parsed
+    return rows, errors, {'read': read_time, 'parse': parse_time}
+
+
+class LoadStats:
+    """
+    Per-stage timers and counters for one load run.
+
+    Stages are 'read' (CSV decoding), 'parse' (field conversion), 'dedupe'
+    (key lookups and row hashing), 'write' (database inserts and updates)
+    and, with worker processes, 'wait' (writer idle waiting for a chunk).
+    Worker read/parse time is summed across processes, so with several
+    workers stage times can add up to more than the wall-clock time.
+    """
+
+    STAGES = ('read', 'parse', 'dedupe', 'write', 'wait')
+
+    def __init__(self):
+        self.timings = dict.fromkeys(self.STAGES, 0.0)
+        self.counters = {}
+
+    def add_time(self, stage, seconds):
+        """Add seconds spent in a stage."""
+        self.timings[stage] += seconds
+
+    def add_timings(self, timings):
+        """Add a {stage: seconds} mapping, e.g. one returned by a worker."""
+        for stage, seconds in timings.items():
+            self.timings[stage] += seconds
+
+    def count(self, name, amount=1):
+        """Increment a named counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def timed(self, stage):
+        """Time the enclosed block as part of a stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] += time.perf_counter() - started
+
+    def as_dict(self, rows, elapsed):
+        """Return a JSON-serialisable report for rows processed in elapsed seconds."""
+        return {
+            'rows': rows,
+            'elapsed_seconds': elapsed,
+            'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0,
+            'stages': {
+                stage: {
+                    'seconds': seconds,
+                    'rows_per_sec': rows / seconds if seconds > 0 else None,
+                }
+                for stage, seconds in self.timings.items()
+            },
+            'counters': dict(self.counters),
+        }
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from crime_api.models import CrimeData
+from crime_api.serializers import CrimeDataSerializer, CrimeSummarySerializer, values_row_serializer
+
+
+class Command(BaseCommand):
+    """
+    Django management command comparing the ModelSerializer and values fast
+    path serializations of the loaded data.
+
+    Usage:
+        python manage.py benchmark_serialization [--year 2015] [--repeat 5]
+
+    Both paths are timed on a full-year response and on the full table, for
+    the list summary and the full record, and the rendered JSON is checked
+    to be byte-identical before any timing is reported.
+    """
+
+    help = 'Benchmark ModelSerializer against the values fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=None,
+                            help='Year for the full-year benchmark (default: latest year)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per measurement; the fastest is reported')
+
+    def handle(self, *args, **options):
+        year = options['year'] or CrimeData.objects.order_by('-year').values_list('year', flat=True).first()
+        if year is None:
+            raise CommandError('No crime data loaded')
+
+        queryset = CrimeData.objects.select_related('state')
+        for label, rows in ((f'year {year}', queryset.filter(year=year)), ('full table', queryset.all())):
+            for serializer_class in (CrimeSummarySerializer, CrimeDataSerializer):
+                self.compare(f'{label}, {serializer_class.__name__}', rows, serializer_class, options['repeat'])
+
+    def compare(self, label, queryset, serializer_class, repeat):
+        """Time both paths on one queryset and report the per-row cost of each."""
+        renderer = JSONRenderer()
+        reader = values_row_serializer(serializer_class)
+
+        def model_serializer():
+            return renderer.render(serializer_class(queryset.all(), many=True).data)
+
+        def fast_path():
+            return renderer.render(reader.to_representation(reader.values(queryset.all())))
+
+        expected = model_serializer()
+        if fast_path() != expected:
+            raise CommandError(f'{label}: fast path output differs from {serializer_class.__name__}')
+
+        count = queryset.count()
+        slow = self.best_of(model_serializer, repeat)
+        fast = self.best_of(fast_path, repeat)
+        self.stdout.write(
+            f'{label} ({count} rows): serializer {slow / count * 1e6:.1f} us/row, '
+            f'fast path {fast / count * 1e6:.1f} us/row, {slow / fast:.1f}x'
+        )
+
+    @staticmethod
+    def best_of(function, repeat):
+        """Return the fastest of repeat runs, in seconds."""
+        timings = []
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,103 @@
+import os
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import connection
+from crime_api import ingest
+from crime_api.models import DatasetMetadata
+
+FINGERPRINT_KEY = 'dataset_fingerprint'
+SOURCE_STAT_KEY = 'dataset_source_stat'
+
+
+def resolve_csv_path(csv_file):
+    """Return csv_file, falling back to a path relative to BASE_DIR."""
+    if not os.path.exists(csv_file):
+        csv_file = os.path.join(settings.BASE_DIR, csv_file)
+        if not os.path.exists(csv_file):
+            raise CommandError(f'CSV file not found: {csv_file}')
+    return csv_file
+
+
+def source_stat(csv_file):
+    """Return a cheap size/mtime signature of the source file."""
+    stat = os.stat(csv_file)
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def fingerprint_matches(csv_file):
+    """
+    Check whether the database was built from this exact CSV file.
+
+    If the file's size and mtime match what was recorded, the stored
+    checksum is trusted without re-reading the file, which keeps the check
+    instant for large datasets. Otherwise the file is hashed and compared,
+    and on a match the new signature is recorded for next time.
+    """
+    stored = DatasetMetadata.get_value(FINGERPRINT_KEY)
+    if not stored:
+        return False
+    if DatasetMetadata.get_value(SOURCE_STAT_KEY) == source_stat(csv_file):
+        return True
+    if ingest.file_checksum(csv_file) != stored:
+        return False
+    DatasetMetadata.set_value(SOURCE_STAT_KEY, source_stat(csv_file))
+    return True
+
+
+def record_fingerprint(csv_file):
+    """Store the checksum and size/mtime signature of the loaded CSV file."""
+    DatasetMetadata.set_value(FINGERPRINT_KEY, ingest.file_checksum(csv_file))
+    DatasetMetadata.set_value(SOURCE_STAT_KEY, source_stat(csv_file))
+
+
+class Command(BaseCommand):
+    """
+    Django management command to build a fully loaded database at image
+    build time.
+
+    Usage:
+        python manage.py build_dataset [path_to_csv]
+
+    Applies migrations, bulk loads the CSV, records the CSV checksum in the
+    DatasetMetadata table, and then runs ANALYZE and (on SQLite) VACUUM so the
+    database file ships compact and with fresh planner statistics. The boot
+    command compares this checksum to skip migrate and load at startup.
+    """
+
+    help = 'Build a loaded, indexed and vacuumed database from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_file',
+            nargs='?',
+            type=str,
+            default='data/state_crime.csv',
+            help='Path to the CSV file containing crime data'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Reload even if the database already matches the CSV file'
+        )
+
+    def handle(self, *args, **options):
+        csv_file = resolve_csv_path(options['csv_file'])
+
+        self.stdout.write('Applying migrations...')
+        call_command('migrate', interactive=False, verbosity=0)
+
+        if not options['force'] and fingerprint_matches(csv_file):
+            self.stdout.write(self.style.SUCCESS('Database already matches the CSV file; nothing to do.'))
+            return
+
+        call_command('load_crime_data', csv_file, clear=True, bulk=True, batch_size=5000, stdout=self.stdout)
+        record_fingerprint(csv_file)
+
+        self.stdout.write('Optimizing database...')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            if connection.vendor == 'sqlite':
+                cursor.execute('VACUUM')
+
+        self.stdout.write(self.style.SUCCESS('Dataset build complete.'))
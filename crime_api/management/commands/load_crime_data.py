@@ -1,8 +1,20 @@
+import cProfile
 import csv
+import json
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-from crime_api.models import CrimeData
+from django.db import connection, transaction
+from crime_api import ingest
+from crime_api.cache import bump_dataset_version
+from crime_api.models import CrimeData, State
+from crime_api.states import normalize_state_key
+
+# Columns rewritten when an upsert finds a changed row
+UPDATE_FIELDS = [field for field in ingest.MODEL_FIELDS if field not in ('state', 'year')] + ['row_hash']
 
 
 class Command(BaseCommand):
@@ -11,8 +23,35 @@ class Command(BaseCommand):
 
     Usage:
         python manage.py load_crime_data [path_to_csv]
+        python manage.py load_crime_data [path_to_csv] --bulk --batch-size 5000
+        python manage.py load_crime_data [path_to_csv] --workers 4
+        python manage.py load_crime_data [path_to_csv] --upsert
+        xzcat drop.csv.xz | python manage.py load_crime_data - --bulk
 
     If no path is provided, looks for 'state_crime.csv' in the data directory.
+
+    The CSV header is matched against the source layouts registered in
+    crime_api.ingest (CORGIS, snake_case and FBI UCR exports) and compiled
+    into positional column lookups once, so rows are read as plain tuples.
+    gzip, bz2 and xz files are decompressed on the fly, and '-' reads from
+    standard input; rows stream through in batches, so memory stays bounded.
+
+    By default every row is checked and inserted individually. With --bulk the
+    existing (state, year) keys are fetched once, rows are buffered and written
+    with bulk_create in --batch-size chunks inside a single transaction.
+
+    With --workers N the file is split into line-aligned chunks that are
+    parsed in a pool of N processes. Parsed chunks stream back, in file order,
+    to a single writer that uses the same bulk path. At most --queue-depth
+    chunks are in flight at once, which bounds memory use.
+
+    With --upsert each parsed row is hashed and compared with the hash stored
+    on the existing record. New rows are inserted, changed rows are updated
+    and unchanged rows are left alone, so a refresh never empties the table.
+
+    Every run ends with a table of time and rows/sec per stage (read, parse,
+    dedupe, write). --stats-json saves the same report as JSON, and --profile
+    writes a cProfile dump of the run.
     """
 
     help = 'Load crime data from CSV file into the database'
@@ -23,176 +62,465 @@ class Command(BaseCommand):
             nargs='?',
             type=str,
             default='data/state_crime.csv',
-            help='Path to the CSV file containing crime data'
+            help="Path to the CSV file (optionally gzip/bz2/xz compressed), or '-' for stdin"
         )
         parser.add_argument(
             '--clear',
             action='store_true',
             help='Clear existing data before loading'
         )
+        parser.add_argument(
+            '--layout',
+            choices=sorted(ingest.SOURCE_LAYOUTS),
+            default=None,
+            help='Source column layout of the CSV file (default: detected from the header)'
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Buffer rows and insert them with bulk_create in one transaction'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows per bulk_create call when using --bulk (default: 1000)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=0,
+            help='Parse the file in N worker processes (implies --bulk)'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Insert new rows and update changed ones, detected by content hash (implies --bulk)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=8 * 1024 * 1024,
+            help='Size of CSV per worker chunk when using --workers (default: 8 MiB)'
+        )
+        parser.add_argument(
+            '--queue-depth',
+            type=int,
+            default=None,
+            help='Maximum parsed chunks held in memory at once (default: 2 x workers)'
+        )
+        parser.add_argument(
+            '--stats-json',
+            type=str,
+            default=None,
+            help='Write per-stage timings and counters to this JSON file'
+        )
+        parser.add_argument(
+            '--profile',
+            type=str,
+            default=None,
+            help='Write a cProfile dump of the load to this file (worker processes are not profiled)'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
         clear_data = options['clear']
 
-        # Check if file exists
-        if not os.path.exists(csv_file):
+        # Check if file exists ('-' reads standard input)
+        if csv_file != '-' and not os.path.exists(csv_file):
             # Try looking in BASE_DIR
             csv_file = os.path.join(settings.BASE_DIR, csv_file)
             if not os.path.exists(csv_file):
                 raise CommandError(f'CSV file not found: {csv_file}')
 
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
+        if options['workers'] < 0 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be positive integers')
+        if options['upsert'] and clear_data:
+            raise CommandError('--upsert and --clear cannot be used together')
+
         self.stdout.write(self.style.SUCCESS(f'Loading data from: {csv_file}'))
 
         # Clear existing data if requested
         if clear_data:
             self.stdout.write('Clearing existing crime data...')
-            CrimeData.objects.all().delete()
+            # A plain DELETE rather than QuerySet.delete(): the post_delete
+            # receivers would make Django fetch and delete rows one batch at a
+            # time to send a signal per row. Nothing references CrimeData, and
+            # the dataset version is bumped once in the finally block below.
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(CrimeData._meta.db_table)}')
             self.stdout.write(self.style.SUCCESS('Existing data cleared.'))
 
         # Load data from CSV
-        loaded_count = 0
-        skipped_count = 0
-        error_count = 0
+        self.batch_size = options['batch_size']
+        self.upsert = options['upsert']
+        self.layout = options['layout']
+        self.loaded_count = 0
+        self.updated_count = 0
+        self.unchanged_count = 0
+        self.skipped_count = 0
+        self.error_count = 0
+        self.state_ids = {}
+        self.state_names = {}
+        for state_id, lookup_key, name in State.objects.values_list('id', 'lookup_key', 'name'):
+            self.state_ids[lookup_key] = state_id
+            self.state_names[state_id] = name
+        self.stats = ingest.LoadStats()
+        profiler = cProfile.Profile() if options['profile'] else None
+        started = time.perf_counter()
 
         try:
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-
-                for row_num, row in enumerate(reader, start=2):  # Start at 2 (accounting for header)
-                    try:
-                        # Parse the row data
-                        crime_data = self.parse_row(row)
-
-                        # Check if this record already exists
-                        existing = CrimeData.objects.filter(
-                            state=crime_data['state'],
-                            year=crime_data['year']
-                        ).first()
-
-                        if existing:
-                            if not clear_data:
-                                skipped_count += 1
-                                if skipped_count <= 5:  # Only show first 5 skips
-                                    self.stdout.write(
-                                        self.style.WARNING(
-                                            f'Row {row_num}: Skipping duplicate - '
-                                            f'{crime_data["state"]} {crime_data["year"]}'
-                                        )
-                                    )
-                                continue
-
-                        # Create the record
-                        CrimeData.objects.create(**crime_data)
-                        loaded_count += 1
-
-                        # Progress indicator
-                        if loaded_count % 100 == 0:
-                            self.stdout.write(f'Loaded {loaded_count} records...')
-
-                    except Exception as e:
-                        error_count += 1
-                        if error_count <= 5:  # Only show first 5 errors
-                            self.stdout.write(
-                                self.style.ERROR(f'Row {row_num}: Error - {str(e)}')
-                            )
+            if profiler:
+                profiler.enable()
+            if options['workers']:
+                self.load_parallel(
+                    self.chunk_tasks(csv_file, options['chunk_size']),
+                    options['workers'],
+                    options['queue_depth'] or 2 * options['workers'],
+                )
+            else:
+                self.load_from_file(csv_file, options['bulk'] or self.upsert, clear_data)
 
+        except CommandError:
+            raise
         except Exception as e:
             raise CommandError(f'Error reading CSV file: {str(e)}')
+        finally:
+            if profiler:
+                profiler.disable()
+            # Bulk writes and the clear send no model signals, so invalidate cached responses here
+            bump_dataset_version()
+
+        elapsed = time.perf_counter() - started
+        processed = (
+            self.loaded_count + self.updated_count + self.unchanged_count
+            + self.skipped_count + self.error_count
+        )
+        rows_per_sec = processed / elapsed if elapsed > 0 else 0.0
 
         # Summary
         self.stdout.write('\n' + '='*50)
-        self.stdout.write(self.style.SUCCESS(f'Successfully loaded: {loaded_count} records'))
-        if skipped_count > 0:
-            self.stdout.write(self.style.WARNING(f'Skipped (duplicates): {skipped_count} records'))
-        if error_count > 0:
-            self.stdout.write(self.style.ERROR(f'Errors: {error_count} records'))
+        self.stdout.write(self.style.SUCCESS(f'Successfully loaded: {self.loaded_count} records'))
+        if self.upsert:
+            self.stdout.write(self.style.SUCCESS(f'Updated (changed): {self.updated_count} records'))
+            self.stdout.write(f'Unchanged: {self.unchanged_count} records')
+        if self.skipped_count > 0:
+            self.stdout.write(self.style.WARNING(f'Skipped (duplicates): {self.skipped_count} records'))
+        if self.error_count > 0:
+            self.stdout.write(self.style.ERROR(f'Errors: {self.error_count} records'))
+        self.stdout.write(f'Processed {processed} rows in {elapsed:.2f}s ({rows_per_sec:,.0f} rows/sec)')
         self.stdout.write('='*50)
 
-    def parse_row(self, row):
-        """
-        Parse a CSV row into a dictionary suitable for CrimeData model.
-
-        Handles different CSV column naming conventions.
-        """
-        # Try to handle both "State" and "state" column names
-        state = row.get('State') or row.get('state', '').strip()
-        year = int(row.get('Year') or row.get('year', 0))
-
-        # Handle nested column names like "Data.Population"
-        population = self.get_value(row, ['Data.Population', 'Population', 'population'])
-
-        return {
-            'state': state,
-            'year': year,
-            'population': int(float(population)),
-
-            # Property crime rates
-            'property_rate_all': float(self.get_value(
-                row, ['Data.Rates.Property.All', 'property_rate_all'], 0
-            )),
-            'property_rate_burglary': float(self.get_value(
-                row, ['Data.Rates.Property.Burglary', 'property_rate_burglary'], 0
-            )),
-            'property_rate_larceny': float(self.get_value(
-                row, ['Data.Rates.Property.Larceny', 'property_rate_larceny'], 0
-            )),
-            'property_rate_motor': float(self.get_value(
-                row, ['Data.Rates.Property.Motor', 'property_rate_motor'], 0
-            )),
-
-            # Violent crime rates
-            'violent_rate_all': float(self.get_value(
-                row, ['Data.Rates.Violent.All', 'violent_rate_all'], 0
-            )),
-            'violent_rate_assault': float(self.get_value(
-                row, ['Data.Rates.Violent.Assault', 'violent_rate_assault'], 0
-            )),
-            'violent_rate_murder': float(self.get_value(
-                row, ['Data.Rates.Violent.Murder', 'violent_rate_murder'], 0
-            )),
-            'violent_rate_rape': float(self.get_value(
-                row, ['Data.Rates.Violent.Rape', 'violent_rate_rape'], 0
-            )),
-            'violent_rate_robbery': float(self.get_value(
-                row, ['Data.Rates.Violent.Robbery', 'violent_rate_robbery'], 0
-            )),
-
-            # Property crime totals
-            'property_total_all': int(float(self.get_value(
-                row, ['Data.Totals.Property.All', 'property_total_all'], 0
-            ))),
-            'property_total_burglary': int(float(self.get_value(
-                row, ['Data.Totals.Property.Burglary', 'property_total_burglary'], 0
-            ))),
-            'property_total_larceny': int(float(self.get_value(
-                row, ['Data.Totals.Property.Larceny', 'property_total_larceny'], 0
-            ))),
-            'property_total_motor': int(float(self.get_value(
-                row, ['Data.Totals.Property.Motor', 'property_total_motor'], 0
-            ))),
-
-            # Violent crime totals
-            'violent_total_all': int(float(self.get_value(
-                row, ['Data.Totals.Violent.All', 'violent_total_all'], 0
-            ))),
-            'violent_total_assault': int(float(self.get_value(
-                row, ['Data.Totals.Violent.Assault', 'violent_total_assault'], 0
-            ))),
-            'violent_total_murder': int(float(self.get_value(
-                row, ['Data.Totals.Violent.Murder', 'violent_total_murder'], 0
-            ))),
-            'violent_total_rape': int(float(self.get_value(
-                row, ['Data.Totals.Violent.Rape', 'violent_total_rape'], 0
-            ))),
-            'violent_total_robbery': int(float(self.get_value(
-                row, ['Data.Totals.Violent.Robbery', 'violent_total_robbery'], 0
-            ))),
-        }
-
-    def get_value(self, row, keys, default=0):
-        """Get value from row trying multiple possible key names."""
-        for key in keys:
-            if key in row and row[key]:
-                return row[key]
-        return default
+        for name in ('loaded', 'updated', 'unchanged', 'skipped', 'error'):
+            self.stats.counters[name] = getattr(self, f'{name}_count')
+        report = self.stats.as_dict(processed, elapsed)
+        self.write_stage_table(report)
+
+        if options['stats_json']:
+            with open(options['stats_json'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f'Load statistics written to: {options["stats_json"]}')
+        if profiler:
+            profiler.dump_stats(options['profile'])
+            self.stdout.write(f'Profile written to: {options["profile"]}')
+
+    def write_stage_table(self, report):
+        """Print time and throughput for each stage of the load."""
+        elapsed = report['elapsed_seconds']
+        self.stdout.write(f'{"Stage":<10}{"Seconds":>10}{"Share":>9}{"Rows/sec":>14}')
+        for stage, timing in report['stages'].items():
+            if not timing['seconds']:
+                continue
+            share = timing['seconds'] / elapsed * 100 if elapsed > 0 else 0.0
+            self.stdout.write(
+                f'{stage:<10}{timing["seconds"]:>10.3f}{share:>8.1f}%{timing["rows_per_sec"]:>14,.0f}'
+            )
+        counters = ', '.join(f'{name}={value}' for name, value in report['counters'].items())
+        self.stdout.write(f'Counters: {counters}')
+        self.stdout.write('='*50)
+
+    def load_from_file(self, csv_file, bulk, clear_data):
+        """Read the CSV file in this process and load it."""
+        with ingest.open_source(csv_file) as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                raise CommandError(f'CSV file is empty: {csv_file}')
+            rows = self.parse_rows(reader, header)
+            if bulk:
+                self.load_bulk(rows)
+            else:
+                self.load_individually(rows, clear_data)
+
+    def parse_rows(self, reader, header):
+        """
+        Yield (location, crime_data) pairs for each parseable row.
+
+        The header is compiled into a column mapper once; rows that fail to
+        convert are reported and skipped.
+        """
+        layout_name, mapper = ingest.compile_mapper(header, self.layout)
+        self.stdout.write(f'Source layout: {layout_name}')
+        perf_counter = time.perf_counter
+        add_time = self.stats.add_time
+        while True:
+            started = perf_counter()
+            values = next(reader, None)
+            parsed = perf_counter()
+            add_time('read', parsed - started)
+            if values is None:
+                return
+            if not values:
+                continue
+            location = f'Row {reader.line_num}'
+            try:
+                crime_data = dict(zip(ingest.MODEL_FIELDS, mapper(values)))
+            except Exception as e:
+                self.report_error(location, e)
+                continue
+            add_time('parse', perf_counter() - parsed)
+            yield location, crime_data
+
+    def load_individually(self, rows, clear_data):
+        """
+        Insert rows one at a time, checking each for an existing record.
+        """
+        for location, crime_data in rows:
+            try:
+                # Check if this record already exists
+                with self.stats.timed('dedupe'):
+                    state_id = self.state_id_for(crime_data['state'])
+                    existing = CrimeData.objects.filter(
+                        state_id=state_id,
+                        year=crime_data['year']
+                    ).first()
+
+                if existing:
+                    if not clear_data:
+                        self.report_skip(location, crime_data)
+                        continue
+
+                # Create the record
+                with self.stats.timed('write'):
+                    self.build_record(crime_data, state_id).save()
+                self.loaded_count += 1
+
+                # Progress indicator
+                if self.loaded_count % 100 == 0:
+                    self.stdout.write(f'Loaded {self.loaded_count} records...')
+
+            except Exception as e:
+                self.report_error(location, e)
+
+    def load_bulk(self, rows):
+        """
+        Insert rows with bulk_create in batches inside a single transaction.
+        """
+        with transaction.atomic():
+            self.start_writer()
+            for location, crime_data in rows:
+                self.write_row(crime_data, location)
+            self.finish_writer()
+
+    def chunk_tasks(self, csv_file, chunk_size):
+        """
+        Yield (label, function, args) parse tasks covering the whole input.
+
+        Uncompressed files are split into byte ranges that each worker reads
+        itself. Compressed files and standard input can only be read
+        sequentially, so blocks of lines are read here and sent to workers.
+        Tasks are generated lazily, so only queued blocks are held in memory.
+        """
+        if ingest.is_plain_file(csv_file):
+            header, data_start = ingest.read_header(csv_file)
+            layout_name, _ = ingest.compile_mapper(header, self.layout)
+            self.stdout.write(f'Source layout: {layout_name}')
+            for start, end in ingest.split_byte_ranges(csv_file, data_start, chunk_size):
+                yield (
+                    f'Chunk at byte {start}',
+                    ingest.parse_chunk,
+                    (csv_file, start, end, header, layout_name),
+                )
+            return
+
+        with ingest.open_source(csv_file) as file:
+            header = next(csv.reader([file.readline()]), None)
+            if header is None:
+                raise CommandError(f'CSV file is empty: {csv_file}')
+            layout_name, _ = ingest.compile_mapper(header, self.layout)
+            self.stdout.write(f'Source layout: {layout_name}')
+            for number, text in enumerate(ingest.iter_line_blocks(file, chunk_size), start=1):
+                label = f'Block {number}'
+                yield label, ingest.parse_text, (text, header, layout_name, label)
+
+    def load_parallel(self, tasks, workers, queue_depth):
+        """
+        Run parse tasks in a process pool and bulk insert the results.
+
+        Futures are consumed in submission order, and a new task is only
+        submitted once an older one has been written, so at most queue_depth
+        chunks are queued or parsed at any time.
+        """
+        self.stdout.write(f'Parsing with {workers} workers...')
+        tasks = iter(tasks)
+        pending = deque()
+        exhausted = False
+
+        with ProcessPoolExecutor(max_workers=workers) as pool, transaction.atomic():
+            self.start_writer()
+            while not exhausted or pending:
+                while not exhausted and len(pending) < queue_depth:
+                    task = next(tasks, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    label, function, args = task
+                    pending.append((label, pool.submit(function, *args)))
+                if not pending:
+                    break
+
+                label, future = pending.popleft()
+                with self.stats.timed('wait'):
+                    rows, errors, timings = future.result()
+                self.stats.add_timings(timings)
+                self.stats.count('chunks')
+                for location, message in errors:
+                    self.report_error(location, message)
+                for values in rows:
+                    self.write_row(dict(zip(ingest.MODEL_FIELDS, values)), label)
+            self.finish_writer()
+
+    def start_writer(self):
+        """
+        Read the existing keys once so each row is checked with a dict lookup.
+
+        In upsert mode the stored content hash is read as well, so unchanged
+        rows can be recognised without touching the database again.
+        """
+        if self.upsert:
+            self.existing = {
+                (state_id, year): (pk, row_hash)
+                for pk, state_id, year, row_hash in CrimeData.objects.values_list(
+                    'pk', 'state_id', 'year', 'row_hash'
+                ).iterator(chunk_size=10000)
+            }
+        else:
+            self.existing = dict.fromkeys(CrimeData.objects.values_list('state_id', 'year'))
+        self.seen_keys = set()
+        self.insert_buffer = []
+        self.update_buffer = []
+
+    def write_row(self, crime_data, location):
+        """
+        Buffer one parsed row for insert or update.
+
+        Keys seen earlier in the same file are treated as duplicates. Without
+        --upsert, keys that already exist in the database are skipped too.
+        """
+        started = time.perf_counter()
+        key = (self.state_id_for(crime_data['state']), crime_data['year'])
+        if key in self.seen_keys or (not self.upsert and key in self.existing):
+            self.report_skip(location, crime_data)
+            return
+        self.seen_keys.add(key)
+
+        # Hash the stored State name, as CrimeData.compute_row_hash does, so a
+        # CSV spelling that differs in case or spacing still matches
+        row_hash = ingest.compute_row_hash({**crime_data, 'state': self.state_names[key[0]]})
+        stored = self.existing.get(key)
+        self.stats.add_time('dedupe', time.perf_counter() - started)
+        if stored is None:
+            self.insert_buffer.append(self.build_record(crime_data, key[0], row_hash=row_hash))
+        elif stored[1] == row_hash:
+            self.unchanged_count += 1
+        else:
+            self.update_buffer.append(self.build_record(crime_data, key[0], pk=stored[0], row_hash=row_hash))
+
+        if len(self.insert_buffer) >= self.batch_size:
+            self.flush_inserts()
+        if len(self.update_buffer) >= self.batch_size:
+            self.flush_updates()
+
+    def state_id_for(self, name):
+        """
+        Return the State key for a parsed state name.
+
+        Keys are cached by normalized name, so each state is looked up or
+        created at most once per load. The canonical name of every key is
+        kept in state_names.
+        """
+        lookup_key = normalize_state_key(name)
+        state_id = self.state_ids.get(lookup_key)
+        if state_id is None:
+            state = State.objects.get_for_name(name)
+            state_id = self.state_ids[lookup_key] = state.id
+            self.state_names[state_id] = state.name
+        return state_id
+
+    @staticmethod
+    def build_record(crime_data, state_id, **extra):
+        """Build an unsaved CrimeData from a parsed row and its State key."""
+        fields = {field: value for field, value in crime_data.items() if field != 'state'}
+        return CrimeData(state_id=state_id, **fields, **extra)
+
+    def finish_writer(self):
+        """Write any rows still buffered."""
+        self.flush_inserts()
+        self.flush_updates()
+
+    def flush_inserts(self):
+        """Write buffered new records with bulk_create."""
+        if not self.insert_buffer:
+            return
+        with self.stats.timed('write'):
+            CrimeData.objects.bulk_create(self.insert_buffer, batch_size=self.batch_size)
+        self.stats.count('insert_batches')
+        self.loaded_count += len(self.insert_buffer)
+        self.insert_buffer = []
+        self.stdout.write(f'Loaded {self.loaded_count} records...')
+
+    def flush_updates(self):
+        """
+        Write buffered changed records.
+
+        Backends that support ON CONFLICT ... DO UPDATE get a single upsert
+        statement per batch; others fall back to bulk_update by primary key.
+        """
+        if not self.update_buffer:
+            return
+        with self.stats.timed('write'):
+            if connection.features.supports_update_conflicts_with_target:
+                CrimeData.objects.bulk_create(
+                    self.update_buffer,
+                    batch_size=self.batch_size,
+                    update_conflicts=True,
+                    unique_fields=['state', 'year'],
+                    update_fields=UPDATE_FIELDS,
+                )
+            else:
+                CrimeData.objects.bulk_update(self.update_buffer, UPDATE_FIELDS, batch_size=self.batch_size)
+        self.stats.count('update_batches')
+        self.updated_count += len(self.update_buffer)
+        self.update_buffer = []
+        self.stdout.write(f'Updated {self.updated_count} records...')
+
+    def report_skip(self, location, crime_data):
+        """Count a duplicate row, printing only the first few."""
+        self.skipped_count += 1
+        if self.skipped_count <= 5:  # Only show first 5 skips
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{location}: Skipping duplicate - '
+                    f'{crime_data["state"]} {crime_data["year"]}'
+                )
+            )
+
+    def report_error(self, location, error):
+        """Count a row that failed to load, printing only the first few."""
+        self.error_count += 1
+        if self.error_count <= 5:  # Only show first 5 errors
+            self.stdout.write(
+                self.style.ERROR(f'{location}: Error - {str(error)}')
+            )
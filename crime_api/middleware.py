@@ -0,0 +1,82 @@
+"""
+Conditional GET support for the API, keyed on the dataset version.
+
+Every API response is a function of the stored data and the request, so a
+strong ETag can be derived from the dataset version plus the request path,
+query string and Accept header without rendering anything. Clients that
+send a matching If-None-Match get 304 Not Modified before the view runs any
+query.
+
+The browsable API's HTML also embeds the logged-in user and a CSRF token,
+so requests that may be answered with HTML add their Cookie header to the
+ETag. Views whose output follows the code rather than the data, such as
+the OpenAPI schema and docs, are marked etag_exempt.
+
+No Last-Modified is sent: HTTP dates have one-second resolution, so a
+write in the same second as the previous one would leave the date
+unchanged and If-Modified-Since clients would get a stale 304.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from .cache import get_dataset_version
+
+API_PREFIX = '/api/'
+
+
+def etag_exempt(view):
+    """Mark a view whose responses change independently of the dataset."""
+    view.etag_exempt = True
+    return view
+
+
+def may_render_html(request):
+    """Return True if content negotiation may pick the browsable API for a request."""
+    return request.GET.get('format') == 'api' or 'text/html' in request.headers.get('Accept', '')
+
+
+def dataset_etag(request, version):
+    """Return the strong ETag for a request against one dataset version."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (
+        str(version),
+        request.path,
+        '&'.join(sorted(request.GET.urlencode().split('&'))),
+        request.headers.get('Accept', ''),
+        request.headers.get('Cookie', '') if may_render_html(request) else '',
+    ):
+        digest.update(part.encode())
+        digest.update(b'\0')
+    return f'"{digest.hexdigest()}"'
+
+
+class DatasetETagMiddleware:
+    """
+    Add an ETag to GET/HEAD responses under /api/ and answer
+    conditional requests with 304 before the view is called.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        etag = getattr(request, 'dataset_etag', None)
+        if etag and response.status_code in (200, 304):
+            response.headers.setdefault('ETag', etag)
+            response.headers.setdefault('Cache-Control', 'no-cache')
+            if may_render_html(request):
+                patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Compute the ETag once the view is known, returning 304 if the client is current."""
+        if request.method not in ('GET', 'HEAD') or not request.path.startswith(API_PREFIX):
+            return None
+        if getattr(view_func, 'etag_exempt', False):
+            return None
+
+        etag = dataset_etag(request, get_dataset_version())
+        request.dataset_etag = etag
+        return get_conditional_response(request, etag=etag)
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-17 01:41
+
+from django.db import migrations, models
+
+from crime_api.ingest import MODEL_FIELDS, compute_row_hash
+
+
+def populate_row_hashes(apps, schema_editor):
+    """Hash existing rows so the first upsert does not rewrite them all."""
+    CrimeData = apps.get_model('crime_api', 'CrimeData')
+    records = []
+    for record in CrimeData.objects.all().iterator(chunk_size=2000):
+        record.row_hash = compute_row_hash({field: getattr(record, field) for field in MODEL_FIELDS})
+        records.append(record)
+    CrimeData.objects.bulk_update(records, ['row_hash'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crime_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crimedata',
+            name='row_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Content hash of the data fields, maintained on save', max_length=32),
+        ),
+        migrations.RunPython(populate_row_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-17 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crime_api', '0002_crimedata_row_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetMetadata',
+            fields=[
+                ('key', models.CharField(help_text='Metadata key', max_length=100, primary_key=True, serialize=False)),
+                ('value', models.TextField(help_text='Metadata value')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the value was last written')),
+            ],
+            options={
+                'verbose_name': 'Dataset Metadata',
+                'verbose_name_plural': 'Dataset Metadata',
+            },
+        ),
+    ]
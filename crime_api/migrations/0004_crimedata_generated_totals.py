@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 02:40
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crime_api', '0003_datasetmetadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crimedata',
+            name='crime_rate_per_capita',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('property_rate_all'), '+', models.F('violent_rate_all')), help_text='Overall crime rate per 100,000 population (property + violent)', output_field=models.FloatField()),
+        ),
+        migrations.AddField(
+            model_name='crimedata',
+            name='total_crimes',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('property_total_all'), '+', models.F('violent_total_all')), help_text='Total number of crimes (property + violent)', output_field=models.BigIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='crimedata',
+            index=models.Index(fields=['year', 'crime_rate_per_capita'], name='crime_api_c_year_7ac4be_idx'),
+        ),
+    ]
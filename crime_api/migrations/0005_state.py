@@ -0,0 +1,45 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+from crime_api.states import abbreviation_for, normalize_state_key
+
+
+def populate_states(apps, schema_editor):
+    """Create one State per distinct name and point crime rows at it."""
+    State = apps.get_model('crime_api', 'State')
+    CrimeData = apps.get_model('crime_api', 'CrimeData')
+    names = CrimeData.objects.order_by('state').values_list('state', flat=True).distinct()
+    for name in names:
+        state, _ = State.objects.get_or_create(
+            lookup_key=normalize_state_key(name),
+            defaults={'name': name, 'abbreviation': abbreviation_for(name)},
+        )
+        CrimeData.objects.filter(state=name).update(state_ref=state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crime_api', '0004_crimedata_generated_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='State',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text='Canonical US State name', max_length=100, unique=True)),
+                ('abbreviation', models.CharField(blank=True, db_index=True, default='', help_text='Postal abbreviation, e.g. CA', max_length=2)),
+                ('lookup_key', models.CharField(editable=False, help_text='Case-folded name used for case-insensitive lookups', max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='crimedata',
+            name='state_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='crime_api.state'),
+        ),
+        migrations.RunPython(populate_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crime_api', '0005_state'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='crimedata',
+            unique_together=set(),
+        ),
+        migrations.RemoveIndex(
+            model_name='crimedata',
+            name='crime_api_c_state_d97fce_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='crimedata',
+            name='crime_api_c_state_0dd4b5_idx',
+        ),
+        migrations.RemoveField(
+            model_name='crimedata',
+            name='state',
+        ),
+        migrations.RenameField(
+            model_name='crimedata',
+            old_name='state_ref',
+            new_name='state',
+        ),
+        migrations.AlterField(
+            model_name='crimedata',
+            name='state',
+            field=models.ForeignKey(help_text='US State', on_delete=django.db.models.deletion.PROTECT, related_name='crime_data', to='crime_api.state'),
+        ),
+        migrations.AlterModelOptions(
+            name='crimedata',
+            options={'ordering': ['-year', 'state__name'], 'verbose_name': 'Crime Data', 'verbose_name_plural': 'Crime Data'},
+        ),
+        migrations.AlterUniqueTogether(
+            name='crimedata',
+            unique_together={('state', 'year')},
+        ),
+        migrations.AddIndex(
+            model_name='crimedata',
+            index=models.Index(fields=['state', 'year'], name='crime_api_c_state_i_77208b_idx'),
+        ),
+    ]
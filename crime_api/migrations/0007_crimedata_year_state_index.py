@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-17 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crime_api', '0006_crimedata_state_fk'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='crimedata',
+            name='crime_api_c_year_40acd2_idx',
+        ),
+        migrations.AddIndex(
+            model_name='crimedata',
+            index=models.Index(fields=['-year', 'state'], name='crime_api_c_year_49bb5b_idx'),
+        ),
+    ]
@@ -1,5 +1,98 @@
 from django.db import models
+from django.db.models import F
 from django.core.validators import MinValueValidator, MaxValueValidator
+from .ingest import MODEL_FIELDS, compute_row_hash
+from .states import abbreviation_for, expand_state_name, normalize_state_key
+
+
+def canonical_state_name(name):
+    """Return the name stored for a user-supplied state name or postal abbreviation."""
+    return ' '.join(expand_state_name(name).split())
+
+
+def state_lookup_key(name):
+    """Return the State.lookup_key a user-supplied state name resolves to."""
+    return normalize_state_key(canonical_state_name(name))
+
+
+class StateManager(models.Manager):
+    """Manager with lookups by user-supplied state names."""
+
+    def get_for_name(self, name):
+        """
+        Return the State for a name or postal abbreviation, creating it if needed.
+
+        Names are matched on their normalized lookup key, so 'new  york' and
+        'New York' resolve to the same row.
+        """
+        name = canonical_state_name(name)
+        state, _ = self.get_or_create(lookup_key=normalize_state_key(name), defaults={'name': name})
+        return state
+
+    def get_for_names(self, names, create=True):
+        """
+        Return {name: State} for many names at once, as get_for_name would.
+
+        Existing states are read in one query; only names with no row yet
+        are created, one at a time. With create=False those names are left
+        out of the result instead.
+        """
+        canonical = {name: canonical_state_name(name) for name in names}
+        existing = self.in_bulk({normalize_state_key(full) for full in canonical.values()}, field_name='lookup_key')
+        states = {}
+        for name, full in canonical.items():
+            key = normalize_state_key(full)
+            if key not in existing:
+                if not create:
+                    continue
+                existing[key] = self.get_for_name(full)
+            states[name] = existing[key]
+        return states
+
+
+class State(models.Model):
+    """
+    Dimension table of US states referenced by CrimeData.
+
+    Each state is stored once with a small integer key, so crime rows carry
+    a 2-byte reference instead of repeating the name, and state filters
+    become integer equality or IN lookups.
+    """
+
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Canonical US State name"
+    )
+    abbreviation = models.CharField(
+        max_length=2,
+        blank=True,
+        default='',
+        db_index=True,
+        help_text="Postal abbreviation, e.g. CA"
+    )
+    lookup_key = models.CharField(
+        max_length=100,
+        unique=True,
+        editable=False,
+        help_text="Case-folded name used for case-insensitive lookups"
+    )
+
+    objects = StateManager()
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        """Derive the lookup key and abbreviation from the name."""
+        self.lookup_key = normalize_state_key(self.name)
+        if not self.abbreviation:
+            self.abbreviation = abbreviation_for(self.name)
+        super().save(*args, **kwargs)
 
 
 class CrimeData(models.Model):
@@ -12,10 +105,11 @@ class CrimeData(models.Model):
     """
 
     # Basic Information
-    state = models.CharField(
-        max_length=100,
-        db_index=True,
-        help_text="US State name"
+    state = models.ForeignKey(
+        State,
+        on_delete=models.PROTECT,
+        related_name='crime_data',
+        help_text="US State"
     )
     year = models.IntegerField(
         validators=[MinValueValidator(1960), MaxValueValidator(2025)],
@@ -107,26 +201,92 @@ class CrimeData(models.Model):
         help_text="Total robberies"
     )
 
+    # Combined figures, computed and stored by the database
+    total_crimes = models.GeneratedField(
+        expression=F('property_total_all') + F('violent_total_all'),
+        output_field=models.BigIntegerField(),
+        db_persist=True,
+        help_text="Total number of crimes (property + violent)"
+    )
+    crime_rate_per_capita = models.GeneratedField(
+        expression=F('property_rate_all') + F('violent_rate_all'),
+        output_field=models.FloatField(),
+        db_persist=True,
+        help_text="Overall crime rate per 100,000 population (property + violent)"
+    )
+
+    # Change detection for incremental loads
+    row_hash = models.CharField(
+        max_length=32,
+        blank=True,
+        default='',
+        editable=False,
+        help_text="Content hash of the data fields, maintained on save"
+    )
+
     class Meta:
-        ordering = ['-year', 'state']
+        ordering = ['-year', 'state__name']
         unique_together = ['state', 'year']
         verbose_name = "Crime Data"
         verbose_name_plural = "Crime Data"
         indexes = [
             models.Index(fields=['state', 'year']),
-            models.Index(fields=['year']),
-            models.Index(fields=['state']),
+            # Serves keyset pagination, which orders by (-year, state_id); the default
+            # ordering sorts by state name through the join and cannot use it
+            models.Index(fields=['-year', 'state']),
+            models.Index(fields=['year', 'crime_rate_per_capita']),
         ]
 
     def __str__(self):
         return f"{self.state} - {self.year}"
 
-    @property
-    def total_crimes(self):
-        """Calculate total number of crimes (property + violent)"""
-        return self.property_total_all + self.violent_total_all
+    def save(self, *args, **kwargs):
+        """Refresh the content hash before writing."""
+        self.row_hash = self.compute_row_hash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'row_hash'}
+        super().save(*args, **kwargs)
+
+    def compute_row_hash(self):
+        """Calculate the content hash of this record's data fields."""
+        values = {field: getattr(self, field) for field in MODEL_FIELDS if field != 'state'}
+        values['state'] = self.state.name
+        return compute_row_hash(values)
+
+
+class DatasetMetadata(models.Model):
+    """
+    Key/value facts about the loaded dataset, such as the checksum of the
+    CSV file it was built from.
+    """
+
+    key = models.CharField(
+        max_length=100,
+        primary_key=True,
+        help_text="Metadata key"
+    )
+    value = models.TextField(
+        help_text="Metadata value"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="When the value was last written"
+    )
+
+    class Meta:
+        verbose_name = "Dataset Metadata"
+        verbose_name_plural = "Dataset Metadata"
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+    @classmethod
+    def get_value(cls, key, default=None):
+        """Return the stored value for key, or default if it is not set."""
+        return cls.objects.filter(key=key).values_list('value', flat=True).first() or default
 
-    @property
-    def crime_rate_per_capita(self):
-        """Calculate overall crime rate per 100,000 population"""
-        return self.property_rate_all + self.violent_rate_all
+    @classmethod
+    def set_value(cls, key, value):
+        """Store a value under key, replacing any previous value."""
+        cls.objects.update_or_create(key=key, defaults={'value': str(value)})
@@ -0,0 +1,134 @@
+"""
+Keyset (cursor) pagination for the crime data list.
+
+Page-number pagination counts the whole result and skips OFFSET rows, so
+deep pages get slower as the table grows. Keyset pagination instead
+remembers the (year, state) key of the last row served and asks for the
+rows after it, which the (-year, state) index answers directly; every
+page costs the same no matter how deep the client goes.
+"""
+from base64 import b64decode, b64encode
+from operator import attrgetter
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate CrimeData by its unique (-year, state) key.
+
+    Within a year rows come in state key order rather than alphabetically,
+    so the sort matches the index exactly.
+
+    Cursors are opaque tokens holding the boundary key and the direction.
+    Clients can ask for up to max_page_size rows with ?page_size=.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 5000
+    invalid_cursor_message = 'Invalid cursor'
+    # Returns (year, state_id) from a row; views paginating tuples swap in an itemgetter
+    key = attrgetter('year', 'state_id')
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+
+    def get_page_size(self, request):
+        """Return the requested page size, capped at max_page_size."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, year, state_id, reverse):
+        """Return the URL for the page after (or, if reverse, before) a key."""
+        token = b64encode(f'{year}:{state_id}:{int(reverse)}'.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """Return (year, state_id, reverse) from the request, or None on the first page."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            year, state_id, reverse = (int(part) for part in b64decode(token).decode().split(':'))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return year, state_id, bool(reverse)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        reverse = False
+        queryset = queryset.order_by('-year', 'state_id')
+        if cursor is not None:
+            year, state_id, reverse = cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(year__gt=year) | Q(year=year, state_id__lt=state_id)
+                ).order_by('year', '-state_id')
+            else:
+                queryset = queryset.filter(Q(year__lt=year) | Q(year=year, state_id__gt=state_id))
+
+        # Fetch one extra row to learn whether another page follows
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Walking backwards, the page we came from follows this one
+        has_next = True if reverse else has_more
+        has_previous = has_more if reverse else cursor is not None
+
+        self.next_url = self.previous_url = None
+        if rows and has_next:
+            self.next_url = self.encode_cursor(*self.key(rows[-1]), reverse=False)
+        if rows and has_previous:
+            self.previous_url = self.encode_cursor(*self.key(rows[0]), reverse=True)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.next_url,
+            'previous': self.previous_url,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Number of results to return per page (at most {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,174 @@
+"""
+JSON rendering for large result sets.
+
+DRF's JSONRenderer encodes the whole of response.data in one json.dumps
+call, so a large result is held once as serialized dicts and again as the
+encoded body before the first byte is sent. StreamingJSONResponse instead
+writes the response envelope and then encodes rows a chunk at a time as they
+come off a queryset iterator, so memory stays flat and time to first byte
+does not grow with the result size.
+
+Both paths encode with orjson when it is installed, falling back to the
+standard library encoder with the same compact settings as JSONRenderer.
+orjson's output parses to the same values as JSONRenderer's but is not
+byte-identical: floats use the shortest exponent form (1e-7 and 1e16
+rather than 1e-07 and 1e+16), and NaN and infinities are written as null
+where JSONRenderer, with STRICT_JSON, raises ValueError.
+
+ArrowRenderer serves the record list of a response as an Arrow IPC stream
+for pandas/NumPy clients; it needs the optional pyarrow package.
+"""
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from .models import CrimeData
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency
+    pa = None
+
+# Line separators JSONRenderer escapes so the output stays a JavaScript subset
+UNSAFE_SEPARATORS = ('\u2028'.encode(), '\u2029'.encode())
+
+
+def encode_json(value):
+    """Encode a value as compact UTF-8 JSON bytes, like JSONRenderer (see the module docstring for orjson's differences)."""
+    if orjson is not None:
+        encoded = orjson.dumps(value, default=JSONEncoder().default, option=orjson.OPT_NON_STR_KEYS)
+        if any(separator in encoded for separator in UNSAFE_SEPARATORS):
+            encoded = encoded.replace(UNSAFE_SEPARATORS[0], b'\\u2028').replace(UNSAFE_SEPARATORS[1], b'\\u2029')
+        return encoded
+    return JSONRenderer().render(value)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed and no indent is asked for."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return encode_json(data)
+
+
+def should_stream(request, count):
+    """
+    Return True if a result of count rows should be streamed.
+
+    Only JSON responses are streamed (the browsable API renders a page),
+    and only past STREAMING_MIN_ROWS, so small results keep going through
+    the normal Response path and the response cache.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    return renderer is not None and renderer.format == 'json' and count >= settings.STREAMING_MIN_ROWS
+
+
+def stream_json(envelope, key, rows, chunk_size, count_key=None):
+    """
+    Yield the JSON encoding of envelope with the rows iterable under key.
+
+    Rows are encoded chunk_size at a time, so no more than one chunk of
+    serialized rows is alive at once. With count_key, the number of rows
+    sent is added under that key after the rows, so it always agrees with
+    them without a separate COUNT query.
+    """
+    prefix = encode_json(envelope)[:-1]
+    yield prefix + (b',' if envelope else b'') + encode_json(key) + b':['
+
+    separator = b''
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield separator + encode_json(chunk)[1:-1]
+            separator = b','
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        yield separator + encode_json(chunk)[1:-1]
+        count += len(chunk)
+    yield b']' + (b',' + encode_json(count_key) + b':' + encode_json(count) if count_key else b'') + b'}'
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """
+    Stream {**envelope, key: [rows...]} as application/json, followed by
+    {count_key: number of rows} when count_key is given.
+
+    rows is consumed lazily while the response is sent, so it should come
+    from a queryset .iterator() rather than a materialized list.
+    """
+
+    def __init__(self, envelope, key, rows, chunk_size=None, count_key=None, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(
+            stream_json(envelope, key, rows, chunk_size or settings.STREAMING_CHUNK_SIZE, count_key), **kwargs
+        )
+
+
+# Response keys holding the record list, in the order they are looked for
+RECORD_KEYS = ('results', 'yearly_data', 'detailed_data')
+
+
+def arrow_type(name):
+    """Return the Arrow type of a CrimeData output field, or None to infer it."""
+    try:
+        field = CrimeData._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if field.is_relation:
+        # Related rows are serialized by name
+        return pa.string()
+    field = getattr(field, 'output_field', None) or field
+    return pa.float64() if field.get_internal_type() == 'FloatField' else pa.int64()
+
+
+class ArrowRenderer(BaseRenderer):
+    """
+    Render a response's records as an Arrow IPC stream.
+
+    The record list (see RECORD_KEYS) becomes one typed column per field;
+    the rest of the response (counts, cursors, statistics) is attached as
+    JSON under the schema's 'envelope' metadata key.
+    """
+
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, list):
+            envelope, records = {}, data
+        else:
+            envelope = dict(data)
+            key = next((key for key in RECORD_KEYS if key in envelope), None)
+            records = envelope.pop(key) if key else []
+
+        columns = {name: [record[name] for record in records] for name in (records[0] if records else ())}
+        arrays = [pa.array(values, type=arrow_type(name)) for name, values in columns.items()]
+        table = pa.Table.from_arrays(
+            arrays, names=list(columns), metadata={'envelope': encode_json(envelope)}
+        )
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+# Renderers of the routes that offer ?format=arrow
+COLUMNAR_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, *([ArrowRenderer] if pa is not None else [])]
@@ -0,0 +1,118 @@
+"""
+In-process resolver turning user-supplied state names into State keys.
+
+Clients ask for states as "CA", "calif" or "new york". The resolver is built
+once per process from the State table and answers those lookups from
+memory, so views filter crime rows on exact integer keys instead of running
+LIKE/ILIKE scans. It is tagged with the dataset version it was built at and
+rebuilt once the version moves on, so writes made by other processes are
+picked up too; State writes in this process also drop it straight away.
+"""
+import difflib
+import threading
+
+from django.conf import settings
+
+from .cache import get_dataset_version
+from .states import normalize_state_key
+
+
+class StateNameResolver:
+    """
+    Resolve free-form state names to State ids.
+
+    Lookups are tried in order: exact (case-insensitive) name, postal
+    abbreviation, name prefix via a character trie, name substring, and
+    finally an optional edit-distance match. The first stage that matches
+    anything wins, so results are deterministic.
+    """
+
+    def __init__(self, states, fuzzy_cutoff=0.8, version=None):
+        """
+        Build the lookup tables from (id, name, abbreviation) tuples.
+
+        A fuzzy_cutoff of 0 disables the edit-distance fallback. version is
+        the dataset version the states were read at.
+        """
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.version = version
+        self.names = {}
+        self.by_key = {}
+        self.by_abbreviation = {}
+        self.trie = {}
+        for state_id, name, abbreviation in states:
+            key = normalize_state_key(name)
+            self.names[state_id] = name
+            self.by_key[key] = state_id
+            if abbreviation:
+                self.by_abbreviation[abbreviation.casefold()] = state_id
+            node = self.trie
+            for char in key:
+                node = node.setdefault(char, {})
+                node.setdefault('ids', []).append(state_id)
+
+    def resolve(self, value):
+        """Return the ids of every state matching value, in name order."""
+        key = normalize_state_key(value)
+        if not key:
+            return []
+        if key in self.by_key:
+            return [self.by_key[key]]
+        if key in self.by_abbreviation:
+            return [self.by_abbreviation[key]]
+
+        node = self.trie
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            return self.sorted_ids(node['ids'])
+
+        matches = [state_id for name_key, state_id in self.by_key.items() if key in name_key]
+        if matches:
+            return self.sorted_ids(matches)
+
+        if self.fuzzy_cutoff:
+            close = difflib.get_close_matches(key, self.by_key, n=1, cutoff=self.fuzzy_cutoff)
+            if close:
+                return [self.by_key[close[0]]]
+        return []
+
+    def resolve_one(self, value):
+        """Return the id of the single state matching value, or None if none or several match."""
+        matches = self.resolve(value)
+        return matches[0] if len(matches) == 1 else None
+
+    def sorted_ids(self, state_ids):
+        """Order state ids by canonical name."""
+        return sorted(state_ids, key=self.names.__getitem__)
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_state_resolver():
+    """Return the process-wide resolver for the current dataset version, rebuilding it after writes."""
+    global _resolver
+    version = get_dataset_version()
+    resolver = _resolver
+    if resolver is None or resolver.version != version:
+        from .models import State
+
+        with _resolver_lock:
+            if _resolver is None or _resolver.version != version:
+                _resolver = StateNameResolver(
+                    State.objects.values_list('id', 'name', 'abbreviation'),
+                    fuzzy_cutoff=getattr(settings, 'STATE_RESOLVER_FUZZY_CUTOFF', 0.8),
+                    version=version,
+                )
+            resolver = _resolver
+    return resolver
+
+
+def invalidate_state_resolver(**kwargs):
+    """Drop the cached resolver so the next lookup rebuilds it. Usable as a signal receiver."""
+    global _resolver
+    _resolver = None
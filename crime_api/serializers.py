@@ -1,8 +1,78 @@
+from functools import lru_cache
+
+from django.db import transaction
 from rest_framework import serializers
-from .models import CrimeData
+from .models import CrimeData, State, state_lookup_key
+
+DUPLICATE_RECORD_MESSAGE = 'The fields state, year must make a unique set.'
+
+
+class SparseFieldsMixin:
+    """
+    Let callers pass fields=[...] to keep only those serializer fields.
+
+    Used for ?fields= sparse fieldsets; the remaining fields keep their
+    declared order.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class StateNameMixin:
+    """
+    Accept the state as a name and store it as a State reference.
+
+    Validation only cleans the name and checks that the (state, year) pair
+    is free with a read. The State row is resolved, and created if it is
+    new, in create() and update() inside the write's transaction, so a
+    rejected write never adds a State row or bumps the dataset version.
+    """
+
+    def validate_state(self, value):
+        """Check the state name's format and return it cleaned."""
+        return self.clean_state_name(value)
+
+    def clean_state_name(self, value):
+        """Check a state name's format and return it stripped and title-cased."""
+        if not value or not value.strip():
+            raise serializers.ValidationError("State name cannot be empty.")
+        if not value.replace(' ', '').isalpha():
+            raise serializers.ValidationError("State name must contain only letters and spaces.")
+        return value.strip().title()
+
+    def validate(self, data):
+        self.validate_unique_state_year(data)
+        return super().validate(data)
+
+    def validate_unique_state_year(self, data):
+        """Reject a (state, year) pair already used by another record."""
+        name = data.get('state', self.instance.state.name if self.instance else None)
+        year = data.get('year', getattr(self.instance, 'year', None))
+        if name is None or year is None:
+            return
+        duplicates = CrimeData.objects.filter(state__lookup_key=state_lookup_key(name), year=year)
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError(DUPLICATE_RECORD_MESSAGE, code='unique')
 
+    def create(self, validated_data):
+        with transaction.atomic():
+            validated_data['state'] = State.objects.get_for_name(validated_data['state'])
+            return super().create(validated_data)
 
-class CrimeDataSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            if 'state' in validated_data:
+                validated_data['state'] = State.objects.get_for_name(validated_data['state'])
+            return super().update(instance, validated_data)
+
+
+class CrimeDataSerializer(StateNameMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for CrimeData model with comprehensive validation.
 
@@ -10,23 +80,18 @@ class CrimeDataSerializer(serializers.ModelSerializer):
     custom validation for state names and year ranges.
     """
 
+    # Accepts and returns the state name; stored as a State reference
+    state = serializers.CharField(max_length=100)
+
     # Computed fields
     total_crimes = serializers.ReadOnlyField()
     crime_rate_per_capita = serializers.ReadOnlyField()
 
     class Meta:
         model = CrimeData
-        fields = '__all__'
-
-    def validate_state(self, value):
-        """
-        Validate that state name is not empty and properly formatted.
-        """
-        if not value or not value.strip():
-            raise serializers.ValidationError("State name cannot be empty.")
-        if not value.replace(' ', '').isalpha():
-            raise serializers.ValidationError("State name must contain only letters and spaces.")
-        return value.strip().title()
+        exclude = ['row_hash']
+        # (state, year) uniqueness is checked by StateNameMixin
+        validators = []
 
     def validate_year(self, value):
         """
@@ -71,14 +136,15 @@ class CrimeDataSerializer(serializers.ModelSerializer):
                         "Property crime rate does not match calculated rate from totals and population."
                     )
 
-        return data
+        return super().validate(data)
 
 
-class CrimeDataCreateSerializer(serializers.ModelSerializer):
+class CrimeDataCreateSerializer(StateNameMixin, serializers.ModelSerializer):
     """
     Simplified serializer for creating new crime data entries via POST.
     Only requires essential fields, with optional detailed breakdown.
     """
+    state = serializers.CharField(max_length=100)
 
     class Meta:
         model = CrimeData
@@ -93,16 +159,37 @@ class CrimeDataCreateSerializer(serializers.ModelSerializer):
             'violent_total_all', 'violent_total_assault',
             'violent_total_murder', 'violent_total_rape', 'violent_total_robbery'
         ]
+        validators = []
 
     def validate_state(self, value):
         """Ensure state name is properly formatted."""
         return value.strip().title()
 
 
-class CrimeSummarySerializer(serializers.ModelSerializer):
+class CrimeDataBulkSerializer(CrimeDataSerializer):
+    """
+    Validates one record of a bulk create.
+
+    Applies every field and cross-field check of CrimeDataSerializer to the
+    CrimeDataCreateSerializer fields, but leaves the state as a cleaned name
+    and drops the per-record unique (state, year) query. The bulk view
+    resolves the states and checks existing pairs once for the whole batch.
+    """
+
+    class Meta:
+        model = CrimeData
+        fields = CrimeDataCreateSerializer.Meta.fields
+        validators = []
+
+    def validate_unique_state_year(self, data):
+        """Left to the bulk view, which checks the whole batch in one query."""
+
+
+class CrimeSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Lightweight serializer for list views with essential information only.
     """
+    state = serializers.StringRelatedField()
     total_crimes = serializers.ReadOnlyField()
     crime_rate_per_capita = serializers.ReadOnlyField()
 
@@ -114,3 +201,66 @@ class CrimeSummarySerializer(serializers.ModelSerializer):
             'violent_total_all', 'property_total_all',
             'total_crimes', 'crime_rate_per_capita'
         ]
+
+
+class ValuesRowSerializer:
+    """
+    Read-only fast path producing the same output as a ModelSerializer.
+
+    The serializer's fields are resolved once into a values_list() column
+    list, so each row is fetched as a plain tuple and turned into a dict by
+    position, with no model instances and no per-field serializer calls.
+    total_crimes and crime_rate_per_capita are generated columns and are
+    read straight from the database like any other column.
+
+    Only fields whose to_representation returns the database value unchanged
+    are supported; anything else raises TypeError at construction time.
+    """
+
+    # Serializer fields whose output equals the value values_list() returns
+    PASSTHROUGH_FIELDS = (
+        serializers.IntegerField, serializers.FloatField, serializers.CharField,
+        serializers.ReadOnlyField, serializers.StringRelatedField,
+    )
+
+    # values_list() lookups for fields whose source is a relation
+    RELATED_COLUMNS = {'state': 'state__name'}
+
+    def __init__(self, serializer_class, fields=None, extra_columns=()):
+        """
+        Resolve the serializer's (optionally sparse) fields into columns.
+
+        extra_columns are appended to every row after the output fields and
+        left out of the output, for callers that also need e.g. sort keys.
+        """
+        self.fields = []
+        self.columns = []
+        for name, field in serializer_class(fields=fields).fields.items():
+            if not isinstance(field, self.PASSTHROUGH_FIELDS):
+                raise TypeError(f'{serializer_class.__name__}.{name} cannot use the values fast path')
+            self.fields.append(name)
+            self.columns.append(self.RELATED_COLUMNS.get(field.source, field.source))
+        self.columns.extend(extra_columns)
+
+    def values(self, queryset):
+        """Return the queryset as tuples of the output columns plus any extra columns."""
+        return queryset.values_list(*self.columns)
+
+    def iterate(self, queryset, chunk_size):
+        """Return an iterator of output dicts read from a server-side cursor, chunk_size rows per fetch."""
+        return map(self.to_representation_row, self.values(queryset).iterator(chunk_size=chunk_size))
+
+    def to_representation_row(self, row):
+        """Turn one fetched tuple into an output dict; extra trailing columns are dropped by zip."""
+        return dict(zip(self.fields, row))
+
+    def to_representation(self, rows):
+        """Turn fetched tuples into output dicts."""
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def values_row_serializer(serializer_class, fields=None, extra_columns=()):
+    """Return a cached ValuesRowSerializer; fields and extra_columns must be tuples."""
+    return ValuesRowSerializer(serializer_class, fields, extra_columns)
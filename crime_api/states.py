@@ -0,0 +1,85 @@
+"""
+Reference data for US state names and postal abbreviations.
+"""
+
+# Postal abbreviation -> canonical state name as used in the CORGIS dataset
+STATE_ABBREVIATIONS = {
+    'AL': 'Alabama',
+    'AK': 'Alaska',
+    'AZ': 'Arizona',
+    'AR': 'Arkansas',
+    'CA': 'California',
+    'CO': 'Colorado',
+    'CT': 'Connecticut',
+    'DE': 'Delaware',
+    'DC': 'District of Columbia',
+    'FL': 'Florida',
+    'GA': 'Georgia',
+    'HI': 'Hawaii',
+    'ID': 'Idaho',
+    'IL': 'Illinois',
+    'IN': 'Indiana',
+    'IA': 'Iowa',
+    'KS': 'Kansas',
+    'KY': 'Kentucky',
+    'LA': 'Louisiana',
+    'ME': 'Maine',
+    'MD': 'Maryland',
+    'MA': 'Massachusetts',
+    'MI': 'Michigan',
+    'MN': 'Minnesota',
+    'MS': 'Mississippi',
+    'MO': 'Missouri',
+    'MT': 'Montana',
+    'NE': 'Nebraska',
+    'NV': 'Nevada',
+    'NH': 'New Hampshire',
+    'NJ': 'New Jersey',
+    'NM': 'New Mexico',
+    'NY': 'New York',
+    'NC': 'North Carolina',
+    'ND': 'North Dakota',
+    'OH': 'Ohio',
+    'OK': 'Oklahoma',
+    'OR': 'Oregon',
+    'PA': 'Pennsylvania',
+    'RI': 'Rhode Island',
+    'SC': 'South Carolina',
+    'SD': 'South Dakota',
+    'TN': 'Tennessee',
+    'TX': 'Texas',
+    'UT': 'Utah',
+    'VT': 'Vermont',
+    'VA': 'Virginia',
+    'WA': 'Washington',
+    'WV': 'West Virginia',
+    'WI': 'Wisconsin',
+    'WY': 'Wyoming',
+    'US': 'United States',
+}
+
+
+def expand_state_name(value):
+    """Return the full state name for a postal abbreviation, else the stripped input."""
+    value = value.strip()
+    if len(value) == 2:
+        return STATE_ABBREVIATIONS.get(value.upper(), value)
+    return value
+
+
+# Canonical state name -> postal abbreviation
+STATE_NAME_ABBREVIATIONS = {name: abbreviation for abbreviation, name in STATE_ABBREVIATIONS.items()}
+
+
+def normalize_state_key(value):
+    """Return the case-folded, whitespace-collapsed lookup key for a state name."""
+    return ' '.join(value.split()).casefold()
+
+
+def abbreviation_for(name):
+    """Return the postal abbreviation for a state name, or '' if unknown."""
+    key = normalize_state_key(name)
+    for state_name, abbreviation in STATE_NAME_ABBREVIATIONS.items():
+        if normalize_state_key(state_name) == key:
+            return abbreviation
+    return ''
@@ -1,9 +1,40 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import lzma
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework.test import APITestCase, APIClient
-from rest_framework import status
-from .models import CrimeData
-from .serializers import CrimeDataSerializer
+from rest_framework.test import APITestCase, APITransactionTestCase, APIClient
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from . import engine, ingest, renderers
+from .models import CrimeData, DatasetMetadata, State
+from . import cache as cache_module
+from .cache import bump_dataset_version, dataset_cache, get_dataset_version
+from .resolver import StateNameResolver, get_state_resolver
+from .forms import CrimeDataForm
+from .views import DETAIL_FIELDS, SUMMARY_FIELDS
+from .serializers import CrimeDataSerializer, CrimeSummarySerializer, ValuesRowSerializer, values_row_serializer
+
+
+def clear_caches():
+    """Drop cached responses and start a fresh dataset version and counters."""
+    cache.clear()
+    dataset_cache().clear()
 
 
 class CrimeDataModelTest(TestCase):
@@ -12,7 +43,7 @@ class CrimeDataModelTest(TestCase):
     def setUp(self):
         """Create test data."""
         self.crime_data = CrimeData.objects.create(
-            state="California",
+            state=State.objects.get_for_name("California"),
             year=2015,
             population=39000000,
             property_rate_all=2500.5,
@@ -37,7 +68,7 @@ class CrimeDataModelTest(TestCase):
 
     def test_crime_data_creation(self):
         """Test that crime data is created correctly."""
-        self.assertEqual(self.crime_data.state, "California")
+        self.assertEqual(self.crime_data.state.name, "California")
         self.assertEqual(self.crime_data.year, 2015)
         self.assertEqual(self.crime_data.population, 39000000)
 
@@ -60,7 +91,7 @@ class CrimeDataModelTest(TestCase):
         """Test that state and year combination must be unique."""
         with self.assertRaises(Exception):
             CrimeData.objects.create(
-                state="California",
+                state=State.objects.get_for_name("California"),
                 year=2015,  # Same state and year as setUp
                 population=39000000,
                 property_rate_all=2500.5,
@@ -84,16 +115,70 @@ class CrimeDataModelTest(TestCase):
             )
 
 
+class StateModelTest(TestCase):
+    """Test cases for the State dimension table."""
+
+    def test_get_for_name_normalizes_lookup(self):
+        """Names differing only in case, spacing or abbreviation share one row."""
+        state = State.objects.get_for_name('New York')
+        self.assertEqual(state.abbreviation, 'NY')
+        self.assertEqual(state.lookup_key, 'new york')
+        self.assertEqual(State.objects.get_for_name('  new   YORK '), state)
+        self.assertEqual(State.objects.get_for_name('ny'), state)
+        self.assertEqual(State.objects.count(), 1)
+
+
+class StateNameResolverTest(TestCase):
+    """Test cases for the in-memory state name resolver."""
+
+    def setUp(self):
+        clear_caches()
+        self.resolver = StateNameResolver([
+            (1, 'New York', 'NY'),
+            (2, 'New Jersey', 'NJ'),
+            (3, 'Virginia', 'VA'),
+            (4, 'West Virginia', 'WV'),
+        ])
+
+    def test_resolution_order(self):
+        """Exact names and abbreviations win over prefix, substring and fuzzy matches."""
+        self.assertEqual(self.resolver.resolve(' new YORK '), [1])
+        self.assertEqual(self.resolver.resolve('nj'), [2])
+        self.assertEqual(self.resolver.resolve('new'), [2, 1])
+        self.assertEqual(self.resolver.resolve('virginia'), [3])
+        self.assertEqual(self.resolver.resolve('west'), [4])
+        self.assertEqual(self.resolver.resolve('jersey'), [2])
+        self.assertEqual(self.resolver.resolve('Virgina'), [3])
+        self.assertEqual(self.resolver.resolve('Texas'), [])
+        self.assertIsNone(self.resolver.resolve_one('new'))
+
+    def test_refreshes_when_states_are_written(self):
+        """Test that the process-wide resolver sees newly created states."""
+        self.assertIsNone(get_state_resolver().resolve_one('Ohio'))
+        ohio = State.objects.get_for_name('Ohio')
+        self.assertEqual(get_state_resolver().resolve_one('OH'), ohio.id)
+
+    def test_refreshes_after_writes_in_other_processes(self):
+        """Test that the resolver is rebuilt when the shared dataset version moves."""
+        self.assertIsNone(get_state_resolver().resolve_one('Ohio'))
+        # Another process writes the row (no signals here) and bumps the shared version
+        State.objects.bulk_create([State(name='Ohio', abbreviation='OH', lookup_key='ohio')])
+        self.assertIsNone(get_state_resolver().resolve_one('Ohio'))
+        bump_dataset_version()
+        self.assertEqual(get_state_resolver().resolve_one('OH'), State.objects.get(name='Ohio').id)
+
+
 class CrimeDataAPITest(APITestCase):
     """Test cases for Crime Data API endpoints."""
 
     def setUp(self):
         """Set up test client and create test data."""
+        clear_caches()
         self.client = APIClient()
 
         # Create test data for California
         self.california_2015 = CrimeData.objects.create(
-            state="California",
+            state=State.objects.get_for_name("California"),
             year=2015,
             population=39000000,
             property_rate_all=2500.5,
@@ -118,7 +203,7 @@ class CrimeDataAPITest(APITestCase):
 
         # Create test data for Texas
         self.texas_2015 = CrimeData.objects.create(
-            state="Texas",
+            state=State.objects.get_for_name("Texas"),
             year=2015,
             population=27000000,
             property_rate_all=2800.0,
@@ -143,7 +228,7 @@ class CrimeDataAPITest(APITestCase):
 
         # Create test data for California 2010
         self.california_2010 = CrimeData.objects.create(
-            state="California",
+            state=State.objects.get_for_name("California"),
             year=2010,
             population=37000000,
             property_rate_all=2700.0,
@@ -212,7 +297,26 @@ class CrimeDataAPITest(APITestCase):
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(CrimeData.objects.count(), 4)
-        self.assertEqual(CrimeData.objects.get(state='New York', year=2015).population, 19700000)
+        self.assertEqual(CrimeData.objects.get(state__name='New York', year=2015).population, 19700000)
+
+    def test_rejected_writes_create_no_states(self):
+        """Test that a State row is only created by a write that passes validation."""
+        version = get_dataset_version()
+        response = self.client.post(reverse('crime-list'), bulk_record('Atlantis', 1900, population=-5), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        url = reverse('crime-detail', kwargs={'pk': self.texas_2015.pk})
+        response = self.client.put(url, bulk_record('Lemuria', 3000), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('crime-list'), bulk_record('tx', 2015), format='json')
+        self.assertEqual(response.data['non_field_errors'], ['The fields state, year must make a unique set.'])
+        form = CrimeDataForm(data=bulk_record('Mu', 1900))
+        self.assertFalse(form.is_valid())
+        self.assertFalse(State.objects.filter(name__in=['Atlantis', 'Lemuria', 'Mu']).exists())
+        self.assertEqual(get_dataset_version(), version)
+
+        form = CrimeDataForm(data=bulk_record('Atlantis', 2015))
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save().state.name, 'Atlantis')
 
     def test_filter_by_state(self):
         """Test filtering crime data by state."""
@@ -250,6 +354,26 @@ class CrimeDataAPITest(APITestCase):
         self.assertIn('yearly_data', response.data)
         self.assertEqual(len(response.data['yearly_data']), 2)
 
+    def test_crime_trends_single_query(self):
+        """Test that crime trends runs one query and computes statistics from it."""
+        url = reverse('crime-trends', kwargs={'state_name': 'california'})
+        get_state_resolver()  # built once per process, not per request
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['year_range'], '2010 to 2015')
+        self.assertEqual(response.data['statistics']['total_murders'], 2145 + 2220)
+        self.assertEqual(response.data['statistics']['max_violent_rate'], 470.0)
+        self.assertEqual(response.data['statistics']['avg_population'], 38000000.0)
+
+    def test_crime_trends_statistics_only(self):
+        """Test that statistics_only omits the per-year payload."""
+        url = reverse('crime-trends', kwargs={'state_name': 'California'})
+        response = self.client.get(url, {'statistics_only': 'true', 'year_from': 2011})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('yearly_data', response.data)
+        self.assertEqual(response.data['data_points'], 1)
+        self.assertEqual(response.data['statistics']['min_violent_rate'], 450.5)
+
     def test_crime_trends_not_found(self):
         """Test crime trends endpoint with non-existent state."""
         url = reverse('crime-trends', kwargs={'state_name': 'NonExistentState'})
@@ -267,6 +391,47 @@ class CrimeDataAPITest(APITestCase):
         self.assertEqual(response.data['states_compared'], 2)
         self.assertIn('comparison', response.data)
 
+    def test_compare_states_filters_on_state_key(self):
+        """Test that state names are resolved in memory to State keys."""
+        url = reverse('compare-states')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'states': 'CALIFORNIA, tx', 'year': 2015})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(row['state'] for row in response.data['comparison']), ['California', 'Texas'])
+        self.assertIn('"state_id" IN (', queries[-1]['sql'])
+        self.assertNotIn('LIKE', queries[-1]['sql'])
+
+    def test_sparse_fieldsets_prune_output_and_columns(self):
+        """Test ?fields= on list, detail, crime trends and compare states."""
+        fields = ['state', 'year', 'violent_rate_murder']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('crime-list'), {'fields': 'violent_rate_murder,state,year'})
+        self.assertEqual(list(response.data['results'][0]), fields)
+        self.assertNotIn('property_total_all', queries[-1]['sql'])
+
+        response = self.client.get(reverse('crime-detail', args=[self.california_2015.pk]), {'fields': 'year'})
+        self.assertEqual(response.data, {'year': 2015})
+
+        url = reverse('crime-trends', kwargs={'state_name': 'California'})
+        response = self.client.get(url, {'fields': 'year,population'})
+        self.assertEqual(list(response.data['yearly_data'][0]), ['year', 'population'])
+        self.assertIn('statistics', response.data)
+
+        response = self.client.get(reverse('compare-states'), {'states': 'California,Texas', 'year': 2015,
+                                                               'fields': 'state'})
+        self.assertEqual(response.data['detailed_data'], [{'state': 'California'}, {'state': 'Texas'}])
+        self.assertIn('murder_rate', response.data['comparison'][0])
+
+        response = self.client.get(reverse('crime-list'), {'fields': 'state,bogus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_crime_trends_resolves_partial_name(self):
+        """Test that crime trends accepts a prefix and echoes the canonical name."""
+        url = reverse('crime-trends', kwargs={'state_name': 'calif'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['state'], 'California')
+
     def test_compare_states_missing_params(self):
         """Test compare states endpoint with missing parameters."""
         url = reverse('compare-states')
@@ -299,6 +464,29 @@ class CrimeDataAPITest(APITestCase):
         self.assertIn('decade_statistics', response.data)
         self.assertGreater(len(response.data['decade_statistics']), 0)
 
+    def test_decade_comparison_buckets(self):
+        """Test SQL-side bucketing with decade and custom widths."""
+        url = reverse('decade-comparison', kwargs={'state_name': 'California'})
+        response = self.client.get(url)
+        stats = response.data['decade_statistics']
+        self.assertEqual(list(stats), ['2010s'])
+        self.assertEqual(stats['2010s']['years_included'], 2)
+        self.assertEqual(stats['2010s']['total_murders'], 2145 + 2220)
+
+        response = self.client.get(url, {'bucket': '5-year'})
+        self.assertEqual(list(response.data['decade_statistics']), ['2010-2014', '2015-2019'])
+
+        response = self.client.get(url, {'bucket': 'fortnight'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_decade_comparison_all_states(self):
+        """Test that every state's buckets come back from one query."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('decade-comparison-all'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['states_analyzed'], 2)
+        self.assertEqual(response.data['decade_statistics']['Texas']['2010s']['years_included'], 1)
+
     def test_crime_type_analysis(self):
         """Test crime type analysis endpoint."""
         url = reverse('crime-type-analysis')
@@ -366,7 +554,7 @@ class CrimeDataSerializerTest(TestCase):
     def setUp(self):
         """Create test data."""
         self.crime_data = CrimeData.objects.create(
-            state="Florida",
+            state=State.objects.get_for_name("Florida"),
             year=2018,
             population=21000000,
             property_rate_all=2600.0,
@@ -428,4 +616,855 @@ class CrimeDataSerializerTest(TestCase):
         if not serializer.is_valid():
             print(f"Serializer errors: {serializer.errors}")
         self.assertTrue(serializer.is_valid())
-        self.assertEqual(serializer.validated_data['state'], 'Florida')
\ No newline at end of file
+        self.assertEqual(serializer.validated_data['state'], 'Florida')
+
+    def test_values_fast_path_renders_identical_json(self):
+        """The values fast path renders byte-for-byte what the ModelSerializers render."""
+        queryset = CrimeData.objects.select_related('state')
+        renderer = JSONRenderer()
+        for serializer_class, fields in (
+            (CrimeSummarySerializer, None),
+            (CrimeDataSerializer, None),
+            (CrimeDataSerializer, ('year', 'state', 'violent_rate_murder', 'total_crimes')),
+        ):
+            reader = values_row_serializer(serializer_class, fields)
+            self.assertEqual(
+                renderer.render(reader.to_representation(reader.values(queryset))),
+                renderer.render(serializer_class(queryset, many=True, fields=fields).data),
+            )
+
+    def test_values_fast_path_rejects_converting_fields(self):
+        """Fields that transform their value cannot take the fast path."""
+        class AbbreviationSerializer(CrimeSummarySerializer):
+            state = serializers.SerializerMethodField()
+
+            def get_state(self, obj):
+                return obj.state.abbreviation
+
+        with self.assertRaises(TypeError):
+            ValuesRowSerializer(AbbreviationSerializer)
+
+    def test_benchmark_serialization_command(self):
+        """The benchmark checks both paths agree and reports per-row timings."""
+        out = StringIO()
+        call_command('benchmark_serialization', repeat=1, stdout=out)
+        self.assertIn('year 2018, CrimeSummarySerializer (1 rows)', out.getvalue())
+        self.assertIn('full table, CrimeDataSerializer (1 rows)', out.getvalue())
+
+
+SAMPLE_CSV_HEADER = (
+    '"State","Year","Data.Population","Data.Rates.Property.All","Data.Rates.Property.Burglary",'
+    '"Data.Rates.Property.Larceny","Data.Rates.Property.Motor","Data.Rates.Violent.All",'
+    '"Data.Rates.Violent.Assault","Data.Rates.Violent.Murder","Data.Rates.Violent.Rape",'
+    '"Data.Rates.Violent.Robbery","Data.Totals.Property.All","Data.Totals.Property.Burglary",'
+    '"Data.Totals.Property.Larceny","Data.Totals.Property.Motor","Data.Totals.Violent.All",'
+    '"Data.Totals.Violent.Assault","Data.Totals.Violent.Murder","Data.Totals.Violent.Rape",'
+    '"Data.Totals.Violent.Robbery"\n'
+)
+
+
+def sample_csv_row(state, year, population=1000000):
+    """Build one CORGIS-layout CSV line for loader tests."""
+    return (
+        f'"{state}","{year}","{population}","3000.0","600.0","2000.0","400.0","500.0",'
+        '"300.0","5.0","40.0","155.0","30000","6000","20000","4000","5000","3000","50",'
+        '"400","1550"\n'
+    )
+
+
+def create_crime_data(state, year, population=1000000, fill=0, **values):
+    """Create a CrimeData row, with every data field not passed in values set to fill."""
+    data = {field: fill for field in ingest.MODEL_FIELDS[3:]}
+    data.update(values)
+    return CrimeData.objects.create(
+        state=State.objects.get_for_name(state), year=year, population=population, **data
+    )
+
+
+class LoadCrimeDataCommandTest(TestCase):
+    """Test cases for the load_crime_data management command."""
+
+    def write_csv(self, rows):
+        """Write a temporary CSV file and return its path."""
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        handle.write(SAMPLE_CSV_HEADER + ''.join(rows))
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_load_individually(self):
+        """Test the default row-by-row loading mode."""
+        path = self.write_csv([sample_csv_row('Alabama', 1960), sample_csv_row('Alaska', 1960)])
+        call_command('load_crime_data', path, stdout=StringIO())
+        self.assertEqual(CrimeData.objects.count(), 2)
+
+    def test_load_bulk_skips_existing_and_repeated_keys(self):
+        """Test that bulk mode skips rows already stored or repeated in the file."""
+        path = self.write_csv([
+            sample_csv_row('Alabama', 1960),
+            sample_csv_row('Alaska', 1960),
+            sample_csv_row('Alaska', 1960),
+            sample_csv_row('Arizona', 1960),
+        ])
+        call_command('load_crime_data', path, stdout=StringIO(), bulk=True, batch_size=1)
+        self.assertEqual(CrimeData.objects.count(), 3)
+
+        out = StringIO()
+        call_command('load_crime_data', path, stdout=out, bulk=True, batch_size=2)
+        self.assertEqual(CrimeData.objects.count(), 3)
+        self.assertIn('Skipped (duplicates): 4 records', out.getvalue())
+        self.assertIn('rows/sec', out.getvalue())
+
+    def test_load_parallel_matches_serial_load(self):
+        """Test that chunked multi-process parsing loads every row exactly once."""
+        rows = [sample_csv_row(state, year) for state in ('Alabama', 'Alaska') for year in range(1960, 1990)]
+        path = self.write_csv(rows)
+        call_command('load_crime_data', path, stdout=StringIO(), workers=2, chunk_size=512, queue_depth=2)
+        self.assertEqual(CrimeData.objects.count(), 60)
+        self.assertEqual(
+            CrimeData.objects.filter(state__name='Alaska', year__gte=1960, year__lt=1990).count(), 30
+        )
+
+    def test_upsert_updates_only_changed_rows(self):
+        """Test that upsert inserts new rows, rewrites changed ones and skips the rest."""
+        call_command(
+            'load_crime_data',
+            self.write_csv([sample_csv_row('Alabama', 1960), sample_csv_row('Alaska', 1960)]),
+            stdout=StringIO(), bulk=True,
+        )
+        original = CrimeData.objects.get(state__name='Alabama', year=1960)
+        self.assertEqual(original.row_hash, original.compute_row_hash())
+
+        out = StringIO()
+        call_command(
+            'load_crime_data',
+            self.write_csv([
+                sample_csv_row('Alabama', 1960),
+                sample_csv_row('Alaska', 1960, population=750000),
+                sample_csv_row('Arizona', 1960),
+            ]),
+            stdout=out, upsert=True,
+        )
+        self.assertIn('Successfully loaded: 1 records', out.getvalue())
+        self.assertIn('Updated (changed): 1 records', out.getvalue())
+        self.assertIn('Unchanged: 1 records', out.getvalue())
+        self.assertEqual(CrimeData.objects.count(), 3)
+        updated = CrimeData.objects.get(state__name='Alaska', year=1960)
+        self.assertEqual(updated.population, 750000)
+        self.assertEqual(updated.row_hash, updated.compute_row_hash())
+        self.assertEqual(CrimeData.objects.get(state__name='Alabama', year=1960).pk, original.pk)
+
+    def test_upsert_hashes_the_canonical_state_name(self):
+        """Test that a differently spelled state name does not count as a change."""
+        path = self.write_csv([sample_csv_row('New York', 1960)])
+        call_command('load_crime_data', path, stdout=StringIO(), bulk=True)
+
+        out = StringIO()
+        call_command('load_crime_data', self.write_csv([sample_csv_row('new  YORK', 1960)]), stdout=out, upsert=True)
+        self.assertIn('Unchanged: 1 records', out.getvalue())
+        record = CrimeData.objects.get(state__name='New York', year=1960)
+        self.assertEqual(record.row_hash, record.compute_row_hash())
+
+    def test_load_fbi_ucr_layout_derives_rates(self):
+        """Test that FBI UCR exports load with abbreviations expanded and rates derived."""
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        handle.write(
+            'year,state_abbr,state_name,population,violent_crime,homicide,rape_legacy,'
+            'rape_revised,robbery,aggravated_assault,property_crime,burglary,larceny,'
+            'motor_vehicle_theft,caveats\n'
+            '2019,TX,,2000000,8000,100,,900,2000,5000,40000,8000,28000,4000,\n'
+        )
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+
+        call_command('load_crime_data', handle.name, stdout=StringIO(), bulk=True)
+        record = CrimeData.objects.get(state__name='Texas', year=2019)
+        self.assertEqual(record.violent_total_rape, 900)
+        self.assertEqual(record.violent_rate_all, 400.0)
+        self.assertEqual(record.property_rate_burglary, 400.0)
+
+    def write_compressed_csv(self, rows, opener, suffix):
+        """Write a temporary compressed CSV file and return its path."""
+        path = self.write_csv([]) + suffix
+        with opener(path, 'wt', encoding='utf-8') as handle:
+            handle.write(SAMPLE_CSV_HEADER + ''.join(rows))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_load_compressed_files(self):
+        """Test that gzip and xz inputs are decompressed transparently."""
+        gz_path = self.write_compressed_csv([sample_csv_row('Alabama', 1960)], gzip.open, '.gz')
+        xz_path = self.write_compressed_csv(
+            [sample_csv_row('Alaska', year) for year in range(1960, 1980)], lzma.open, '.xz'
+        )
+        call_command('load_crime_data', gz_path, stdout=StringIO(), bulk=True)
+        call_command('load_crime_data', xz_path, stdout=StringIO(), workers=2, chunk_size=400)
+        self.assertEqual(CrimeData.objects.filter(state__name='Alabama').count(), 1)
+        self.assertEqual(CrimeData.objects.filter(state__name='Alaska').count(), 20)
+
+    def test_load_from_stdin(self):
+        """Test that '-' reads CSV data from standard input."""
+        data = gzip.compress((SAMPLE_CSV_HEADER + sample_csv_row('Arizona', 1961)).encode('utf-8'))
+        stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(data)))
+        with mock.patch('sys.stdin', stdin):
+            call_command('load_crime_data', '-', stdout=StringIO(), bulk=True)
+        self.assertTrue(CrimeData.objects.filter(state__name='Arizona', year=1961).exists())
+
+    def test_stats_json_and_profile_outputs(self):
+        """Test that per-stage statistics and a cProfile dump are written."""
+        path = self.write_csv([sample_csv_row('Alabama', year) for year in range(1960, 1965)])
+        stats_path = path + '.json'
+        profile_path = path + '.prof'
+        self.addCleanup(os.remove, stats_path)
+        self.addCleanup(os.remove, profile_path)
+
+        out = StringIO()
+        call_command(
+            'load_crime_data', path, stdout=out, bulk=True,
+            stats_json=stats_path, profile=profile_path,
+        )
+        with open(stats_path, encoding='utf-8') as file:
+            report = json.load(file)
+        self.assertEqual(report['rows'], 5)
+        self.assertEqual(report['counters']['loaded'], 5)
+        self.assertGreater(report['stages']['write']['seconds'], 0)
+        self.assertIn('Stage', out.getvalue())
+        self.assertGreater(len(pstats.Stats(profile_path).stats), 0)
+
+
+class DatasetBuildTest(TransactionTestCase):
+    """Test cases for the build_dataset and boot management commands."""
+
+    def test_boot_skips_work_when_fingerprint_matches(self):
+        """Test that boot loads a stale database but skips a current one."""
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        handle.write(SAMPLE_CSV_HEADER + sample_csv_row('Alabama', 1960))
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+
+        call_command('build_dataset', handle.name, stdout=StringIO())
+        self.assertEqual(CrimeData.objects.count(), 1)
+        self.assertEqual(DatasetMetadata.get_value('dataset_fingerprint'), ingest.file_checksum(handle.name))
+
+        out = StringIO()
+        call_command('boot', handle.name, stdout=out)
+        self.assertIn('skipping migrate and load', out.getvalue())
+
+        with open(handle.name, 'a') as extra:
+            extra.write(sample_csv_row('Alaska', 1960))
+        out = StringIO()
+        call_command('boot', handle.name, stdout=out)
+        self.assertIn('out of date', out.getvalue())
+        self.assertEqual(CrimeData.objects.count(), 2)
+
+    @skipUnless(engine.np is not None, 'NumPy is not installed')
+    def test_boot_publishes_snapshot_only_for_the_numpy_engine(self):
+        """Test that boot skips the shared snapshot when every endpoint uses the ORM."""
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        handle.write(SAMPLE_CSV_HEADER + sample_csv_row('Alabama', 1960))
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        call_command('build_dataset', handle.name, stdout=StringIO())
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with self.settings(ENGINE_SNAPSHOT_DIR=directory, ANALYTICS_ENGINE='orm', ANALYTICS_ENGINES={}):
+            call_command('boot', handle.name, stdout=StringIO())
+        self.assertEqual(os.listdir(directory), [])
+
+        with self.settings(ENGINE_SNAPSHOT_DIR=directory, ANALYTICS_ENGINE='orm',
+                           ANALYTICS_ENGINES={'crime_matrix': 'numpy'}), mock.patch.object(engine, '_dataset', None):
+            out = StringIO()
+            call_command('boot', handle.name, stdout=out)
+        self.assertIn('Engine snapshot ready', out.getvalue())
+
+
+class SourceLayoutTest(TestCase):
+    """Test cases for the compiled CSV source layouts."""
+
+    def test_detect_layout(self):
+        """Test that headers are matched to the right registered layout."""
+        self.assertEqual(ingest.detect_layout(SAMPLE_CSV_HEADER.strip().replace('"', '').split(',')), 'corgis')
+        self.assertEqual(ingest.detect_layout(ingest.MODEL_FIELDS), 'snake_case')
+        with self.assertRaises(ValueError):
+            ingest.detect_layout(['foo', 'bar'])
+
+    def test_mapper_returns_model_ordered_tuple(self):
+        """Test that a compiled mapper converts values positionally."""
+        header = list(reversed(ingest.MODEL_FIELDS))
+        values = ['7' if field != 'state' else ' Ohio ' for field in header]
+        values[header.index('violent_rate_murder')] = ''
+        layout_name, mapper = ingest.compile_mapper(header)
+        row = dict(zip(ingest.MODEL_FIELDS, mapper(values)))
+        self.assertEqual(layout_name, 'snake_case')
+        self.assertEqual(row['state'], 'Ohio')
+        self.assertEqual(row['population'], 7)
+        self.assertEqual(row['property_rate_all'], 7.0)
+        self.assertEqual(row['violent_rate_murder'], 0)
+
+
+class GeneratedColumnQueryTest(APITestCase):
+    """Test cases for endpoints that filter and sort on stored combined rates."""
+
+    def setUp(self):
+        """Create one record per state with increasing combined rates."""
+        clear_caches()
+        for index, state in enumerate(['Alabama', 'Alaska', 'Arizona', 'Arkansas']):
+            create_crime_data(
+                state, 2015, property_rate_all=1000.0 * (index + 1), violent_rate_all=100.0,
+                property_total_all=10000, violent_total_all=1000,
+            )
+
+    def test_generated_columns_are_queryable(self):
+        """Test that combined figures are stored and usable in filters."""
+        self.assertEqual(CrimeData.objects.filter(crime_rate_per_capita__gte=3000).count(), 2)
+        self.assertEqual(CrimeData.objects.filter(total_crimes=11000).count(), 4)
+
+    def test_high_crime_states_all_types(self):
+        """Test the combined-rate threshold filter."""
+        response = self.client.get(reverse('high-crime-states'), {'threshold': 2100, 'year': 2015})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['state'] for r in response.data['results']], ['Alaska', 'Arizona', 'Arkansas'])
+
+    def test_safest_states_all_types(self):
+        """Test the combined-rate top-k ordering."""
+        response = self.client.get(reverse('safest-states'), {'year': 2015, 'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['state'] for r in response.data['safest_states']], ['Alabama', 'Alaska'])
+        self.assertEqual(response.data['safest_states'][0]['crime_rate_per_capita'], 1100.0)
+
+
+class ResponseCacheTest(APITransactionTestCase):
+    """
+    Test cases for the write-invalidated analytical response cache.
+
+    Transactional, so writes commit and their on_commit version bumps run.
+    """
+
+    def setUp(self):
+        clear_caches()
+        for state in ('California', 'Texas'):
+            create_crime_data(state, 2015)
+        get_state_resolver()
+
+    def test_tests_use_a_private_cache(self):
+        """Test that clearing the cache here cannot touch a server's shared cache."""
+        for alias in ('default', 'dataset'):
+            self.assertIsInstance(caches[alias], LocMemCache)
+
+    def test_file_cache_counters_do_not_lose_updates(self):
+        """Test that concurrent lookups on the file backend are all counted."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        file_cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}
+        with override_settings(CACHES={**settings.CACHES, 'dataset': file_cache}):
+            threads = [
+                threading.Thread(target=lambda: [cache_module.record_lookup('safest_states', 'hits') for _ in range(25)])
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(cache_module.cache_statistics()['safest_states']['hits'], 200)
+
+    def test_evicting_responses_keeps_the_version(self):
+        """Test that the version and counters survive losing every cached response."""
+        url = reverse('safest-states')
+        self.client.get(url, {'year': 2015})
+        version = get_dataset_version()
+        cache.clear()
+        self.assertEqual(get_dataset_version(), version)
+        self.client.get(url, {'year': 2015})
+        self.assertEqual(self.client.get(reverse('cache-stats')).data['endpoints']['safest_states']['misses'], 2)
+
+    def test_repeated_request_skips_database(self):
+        """Test that equivalent state lists share one entry and hits run no queries."""
+        url = reverse('compare-states')
+        first = self.client.get(url, {'states': 'Texas,California', 'year': 2015})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'year': '2015', 'states': 'california, TEXAS'})
+        self.assertEqual(second.data, first.data)
+
+        stats = self.client.get(reverse('cache-stats')).data['endpoints']['compare_states']
+        self.assertEqual(stats, {'hits': 1, 'misses': 1})
+
+    def test_writes_invalidate_cached_responses(self):
+        """Test that saves and data loads both move to a new dataset version."""
+        url = reverse('safest-states')
+        self.assertEqual(len(self.client.get(url, {'year': 2015}).data['safest_states']), 2)
+
+        CrimeData.objects.filter(state__name='Texas').first().delete()
+        self.assertEqual(len(self.client.get(url, {'year': 2015}).data['safest_states']), 1)
+
+        version = get_dataset_version()
+        stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(SAMPLE_CSV_HEADER.encode('utf-8'))))
+        with mock.patch('sys.stdin', stdin):
+            call_command('load_crime_data', '-', stdout=StringIO(), bulk=True)
+        self.assertGreater(get_dataset_version(), version)
+
+    def test_version_bumps_once_per_committed_transaction(self):
+        """Test that a transaction's writes queue one bump and a rollback queues none."""
+        with mock.patch.object(cache_module, 'bump_dataset_version', wraps=bump_dataset_version) as bump:
+            with transaction.atomic():
+                for record in CrimeData.objects.all():
+                    record.population += 1
+                    record.save()
+                State.objects.get_for_name('Utah')
+                self.assertEqual(bump.call_count, 0)
+            self.assertEqual(bump.call_count, 1)
+
+            with transaction.atomic():
+                CrimeData.objects.filter(state__name='Texas').delete()
+                transaction.set_rollback(True)
+            self.assertEqual(bump.call_count, 1)
+
+            CrimeData.objects.filter(state__name='Texas').delete()
+            self.assertEqual(bump.call_count, 2)
+
+    def test_clear_uses_a_single_delete(self):
+        """Test that load_crime_data --clear deletes the table without per-row queries."""
+        version = get_dataset_version()
+        stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(SAMPLE_CSV_HEADER.encode('utf-8'))))
+        with mock.patch('sys.stdin', stdin), CaptureQueriesContext(connection) as queries:
+            call_command('load_crime_data', '-', stdout=StringIO(), clear=True, bulk=True)
+        table = CrimeData._meta.db_table
+        self.assertEqual([query['sql'] for query in queries if query['sql'].startswith('DELETE')],
+                         [f'DELETE FROM "{table}"'])
+        self.assertFalse(CrimeData.objects.exists())
+        self.assertGreater(get_dataset_version(), version)
+
+
+class ConditionalGetTest(APITransactionTestCase):
+    """Test cases for dataset-version ETags and 304 responses under /api/."""
+
+    def setUp(self):
+        clear_caches()
+        self.record = create_crime_data('Ohio', 2015)
+
+    def test_matching_etag_returns_304_without_queries(self):
+        """Test list, detail and analytical routes answer If-None-Match before querying."""
+        for url, params in (
+            (reverse('crime-list'), {'year': 2015}),
+            (reverse('crime-detail', args=[self.record.pk]), {}),
+            (reverse('safest-states'), {'year': 2015}),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('Last-Modified', response)
+            with self.assertNumQueries(0):
+                cached = self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_etag_changes_with_parameters_and_writes(self):
+        """Test that other parameters or a write produce a different ETag."""
+        url = reverse('crime-list')
+        etag = self.client.get(url, {'year': 2015})['ETag']
+        self.assertNotEqual(self.client.get(url, {'year': 2014})['ETag'], etag)
+
+        self.record.population = 2000000
+        self.record.save()
+        response = self.client.get(url, {'year': 2015}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_html_etag_covers_cookies_and_docs_are_exempt(self):
+        """Test that browsable-API ETags change with the session and schema/docs get none."""
+        url = reverse('crime-list')
+        json_etag = self.client.get(url, HTTP_ACCEPT='application/json')['ETag']
+        html_etag = self.client.get(url, HTTP_ACCEPT='text/html')['ETag']
+        self.client.cookies['sessionid'] = 'other-user'
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT='application/json')['ETag'], json_etag)
+        response = self.client.get(url, HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=html_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Cookie', response['Vary'])
+        for name in ('schema', 'swagger-ui', 'redoc'):
+            self.assertNotIn('ETag', self.client.get(reverse(name)))
+
+    def test_if_modified_since_is_not_answered(self):
+        """Test that a date cannot produce a 304 that misses a write in the same second."""
+        response = self.client.get(reverse('crime-list'), HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@skipUnless(engine.np is not None, 'NumPy is not installed')
+class ColumnarEngineTest(APITransactionTestCase):
+    """Test that the NumPy engine returns the same responses as the ORM."""
+
+    def setUp(self):
+        clear_caches()
+        for state_index, state in enumerate(['Texas', 'Alaska', 'Ohio']):
+            for year in range(1995, 2008):
+                seed = state_index * 31 + year
+                values = {field: (seed * (position + 7)) % 997 for position, field in enumerate(ingest.MODEL_FIELDS[3:])}
+                values.update({field: value + 0.5 for field, value in values.items() if '_rate_' in field})
+                create_crime_data(state, year, population=100000 + seed, **values)
+
+    def get_with_engine(self, engine_name, url, params):
+        """Fetch a response with every endpoint switched to one engine."""
+        clear_caches()
+        with self.settings(ANALYTICS_ENGINE=engine_name):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_engine_matches_orm(self):
+        """Test every analytical endpoint under both engines."""
+        requests = [
+            (reverse('high-crime-states'), {'threshold': 900}),
+            (reverse('high-crime-states'), {'threshold': 400, 'year': 2001, 'crime_type': 'violent'}),
+            (reverse('crime-trends', kwargs={'state_name': 'ohio'}), {'year_from': 1998, 'year_to': 2004}),
+            (reverse('compare-states'), {'states': 'Texas,Alaska', 'year': 2003}),
+            (reverse('safest-states'), {'year': 2000, 'limit': 2, 'crime_type': 'property'}),
+            (reverse('crime-type-analysis'), {'year': 2005, 'crime_type': 'murder', 'sort': 'total'}),
+            (reverse('decade-comparison', kwargs={'state_name': 'Texas'}), {'bucket': '5-year'}),
+            (reverse('decade-comparison-all'), {}),
+            (reverse('crime-matrix'), {}),
+            (reverse('crime-matrix'), {'metric': 'violent_total_murder', 'states': 'ohio,TX', 'year_from': 2000}),
+        ]
+        for url, params in requests:
+            with self.subTest(url=url, params=params):
+                orm = self.get_with_engine('orm', url, params)
+                columnar = self.get_with_engine('numpy', url, params)
+                self.assertEqual(json.dumps(columnar, sort_keys=True), json.dumps(orm, sort_keys=True))
+
+    def test_snapshot_reloads_after_writes(self):
+        """Test that a write moves the engine to a fresh snapshot."""
+        dataset = engine.get_dataset()
+        self.assertIs(engine.get_dataset(), dataset)
+        CrimeData.objects.filter(state__name='Ohio').first().delete()
+        self.assertEqual(len(engine.get_dataset()), len(dataset) - 1)
+
+    def test_shared_snapshot_is_memory_mapped_and_swapped(self):
+        """Test that workers attach to the published files and follow version swaps."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with self.settings(ENGINE_SNAPSHOT_DIR=directory):
+            built = engine.get_dataset()
+            first_version = built.version
+            self.assertIsInstance(built.columns['violent_rate_all'], engine.np.memmap)
+
+            # A freshly started worker attaches without querying the database
+            with mock.patch.object(engine, '_dataset', None), self.assertNumQueries(0):
+                attached = engine.get_dataset()
+            self.assertEqual(attached.records(attached.default_order[:3], SUMMARY_FIELDS),
+                             built.records(built.default_order[:3], SUMMARY_FIELDS))
+
+            CrimeData.objects.filter(state__name='Ohio').first().delete()
+            swapped = engine.get_dataset()
+            self.assertEqual(len(swapped), len(built) - 1)
+            self.assertEqual(os.readlink(os.path.join(directory, 'current')), str(swapped.version))
+            self.assertFalse(os.path.exists(os.path.join(directory, str(first_version))))
+
+
+class KeysetPaginationTest(APITestCase):
+    """Test cases for ?paginate=cursor on the crime data list."""
+
+    def setUp(self):
+        for state in ('Texas', 'Ohio', 'Utah'):
+            for year in (2013, 2014, 2015):
+                create_crime_data(state, year)
+        self.expected = list(CrimeData.objects.order_by('-year', 'state_id').values_list('id', flat=True))
+
+    def test_walks_every_row_forwards_and_backwards(self):
+        """Test that next and previous cursors visit each row once, one query per page."""
+        url = reverse('crime-list') + '?paginate=cursor&page_size=4'
+        seen, pages = [], []
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertNotIn('count', response.data)
+            seen += [row['id'] for row in response.data['results']]
+            pages.append(response.data)
+            url = response.data['next']
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 3)
+
+        previous = self.client.get(pages[-1]['previous']).data
+        self.assertEqual(previous['results'], pages[1]['results'])
+        first = self.client.get(previous['previous']).data
+        self.assertEqual(first['results'], pages[0]['results'])
+        self.assertIsNone(first['previous'])
+
+    def test_page_size_and_invalid_cursor(self):
+        """Test that large page sizes are accepted and bad cursors return 404."""
+        response = self.client.get(reverse('crime-list'), {'paginate': 'cursor', 'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 9)
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(reverse('crime-list'), {'paginate': 'cursor', 'cursor': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StreamingResponseTest(APITestCase):
+    """Test cases for streaming large JSON results."""
+
+    def setUp(self):
+        clear_caches()
+        for state in ('Texas', 'Ohio', 'Utah'):
+            for year in (2014, 2015):
+                create_crime_data(state, year)
+
+    def fetch(self, url, params, min_rows):
+        """Return the body of a JSON response with streaming starting at min_rows rows."""
+        with override_settings(STREAMING_MIN_ROWS=min_rows, STREAMING_CHUNK_SIZE=4):
+            response = self.client.get(url, params, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.streaming, b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_large_results_stream_the_same_bytes(self):
+        """Test that streamed responses match the buffered ones byte for byte."""
+        for url, params in (
+            (reverse('high-crime-states'), {'threshold': 0}),
+            (reverse('crime-list'), {'paginate': 'cursor', 'page_size': 10}),
+        ):
+            streamed, body = self.fetch(url, params, min_rows=5)
+            self.assertTrue(streamed)
+            clear_caches()
+            buffered, expected = self.fetch(url, params, min_rows=1000)
+            self.assertFalse(buffered)
+            self.assertEqual(body, expected)
+            self.assertEqual(len(json.loads(body)['results']), 6)
+
+    @skipUnless(renderers.orjson is not None, 'orjson is not installed')
+    def test_orjson_encodes_the_same_values(self):
+        """Test that orjson output parses like JSONRenderer's, with the documented differences."""
+        data = {'rates': [1e-7, 1e16, 0.1, 2500.5], 'state': 'Ohio\u2028'}
+        self.assertEqual(json.loads(renderers.encode_json(data)), json.loads(JSONRenderer().render(data)))
+        self.assertIn(b'1e-7,1e16', renderers.encode_json(data))
+        self.assertEqual(renderers.encode_json([float('nan')]), b'[null]')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render([float('nan')])
+
+    def test_high_crime_states_reads_rows_in_one_query(self):
+        """Test that both the buffered and streamed forms skip COUNT and count the rows sent."""
+        url = reverse('high-crime-states')
+        for min_rows, streamed in ((1000, False), (5, True)):
+            clear_caches()
+            with self.assertNumQueries(1):
+                is_streamed, body = self.fetch(url, {'threshold': 0}, min_rows=min_rows)
+            self.assertEqual(is_streamed, streamed)
+            data = json.loads(body)
+            self.assertEqual(data['count'], len(data['results']))
+            self.assertEqual(data['count'], 6)
+
+    def test_small_results_are_not_streamed(self):
+        """Test that results under the threshold keep the normal cached response."""
+        streamed, _ = self.fetch(reverse('high-crime-states'), {'threshold': 0, 'year': 2015}, min_rows=5)
+        self.assertFalse(streamed)
+
+
+class ExportTest(APITestCase):
+    """Test cases for the streaming CSV/NDJSON export."""
+
+    def setUp(self):
+        for state in ('Texas', 'Ohio'):
+            for year in (2014, 2015):
+                create_crime_data(state, year)
+
+    def test_csv_and_ndjson_match_the_list_filters(self):
+        """Test that both formats stream the filtered rows with every record field."""
+        with override_settings(STREAMING_CHUNK_SIZE=1):
+            response = self.client.get(reverse('crime-export'), {'year': 2015})
+            self.assertTrue(response.streaming)
+            lines = b''.join(response.streaming_content).decode().splitlines()
+            self.assertEqual(lines[0].split(','), DETAIL_FIELDS)
+            self.assertEqual(sorted(line.split(',')[1] for line in lines[1:]), ['Ohio', 'Texas'])
+
+            response = self.client.get(reverse('crime-export'), {'format': 'ndjson', 'state': 'tx', 'compress': 'gzip'})
+            self.assertEqual(response['Content-Type'], 'application/gzip')
+            self.assertIn('crime_data.ndjson.gz', response['Content-Disposition'])
+            rows = [json.loads(line) for line in gzip.decompress(b''.join(response.streaming_content)).splitlines()]
+        self.assertEqual([(row['state'], row['year']) for row in rows], [('Texas', 2015), ('Texas', 2014)])
+
+    def test_rejects_unknown_format_and_bad_filters(self):
+        """Test that bad parameters are reported before streaming starts."""
+        for params in ({'format': 'xml'}, {'compress': 'zip'}, {'year': 'abc'}):
+            response = self.client.get(reverse('crime-export'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@skipUnless(renderers.pa is not None, 'pyarrow is not installed')
+class ArrowRendererTest(APITestCase):
+    """Test cases for the Arrow IPC columnar format."""
+
+    def setUp(self):
+        clear_caches()
+        for state in ('Texas', 'Ohio'):
+            create_crime_data(state, 2015, fill=1)
+
+    def read_table(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+        table = renderers.pa.ipc.open_stream(response.content).read_all()
+        return table, json.loads(table.schema.metadata[b'envelope'])
+
+    def test_list_columns_are_typed(self):
+        """Test that ?format=arrow returns typed columns with the pagination envelope."""
+        table, envelope = self.read_table(self.client.get(reverse('crime-list'), {'format': 'arrow'}))
+        self.assertEqual(table.column_names, SUMMARY_FIELDS)
+        self.assertEqual(str(table.schema.field('state').type), 'string')
+        self.assertEqual(str(table.schema.field('population').type), 'int64')
+        self.assertEqual(str(table.schema.field('crime_rate_per_capita').type), 'double')
+        self.assertEqual(table.column('state').to_pylist(), ['Ohio', 'Texas'])
+        self.assertEqual(envelope['count'], 2)
+
+    def test_comparison_by_content_negotiation(self):
+        """Test that the Arrow media type selects the format on compare-states."""
+        response = self.client.get(
+            reverse('compare-states'), {'states': 'Texas,Ohio', 'year': 2015},
+            HTTP_ACCEPT='application/vnd.apache.arrow.stream',
+        )
+        table, envelope = self.read_table(response)
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column_names, DETAIL_FIELDS)
+        self.assertEqual(envelope['states_compared'], 2)
+
+
+class CrimeMatrixTest(APITestCase):
+    """Test cases for the state x year matrix endpoint."""
+
+    def setUp(self):
+        clear_caches()
+        for state, year, rate in (('Texas', 2014, 1.5), ('Texas', 2015, 2.5), ('Ohio', 2015, 3.5)):
+            create_crime_data(state, year, violent_rate_murder=rate)
+
+    def test_matrix_layout_with_gaps(self):
+        """Test that values are laid out by state and year with null for missing rows."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('crime-matrix'), {'metric': 'violent_rate_murder'})
+        self.assertEqual(response.data, {
+            'metric': 'violent_rate_murder',
+            'states': ['Ohio', 'Texas'],
+            'years': [2014, 2015],
+            'values': [[None, 3.5], [1.5, 2.5]],
+        })
+
+        response = self.client.get(reverse('crime-matrix'), {'states': 'tx', 'year_from': 2015})
+        self.assertEqual(response.data['states'], ['Texas'])
+        self.assertEqual(response.data['years'], [2015])
+
+    def test_invalid_metric_and_no_data(self):
+        """Test that unknown metrics return 400 and empty selections 404."""
+        response = self.client.get(reverse('crime-matrix'), {'metric': 'state'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('crime-matrix'), {'year_from': 2020})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+def bulk_record(state, year, **overrides):
+    """Build one valid create payload for bulk tests."""
+    record = {
+        'state': state, 'year': year, 'population': 1000000,
+        'property_rate_all': 3000.0, 'property_rate_burglary': 600.0, 'property_rate_larceny': 2000.0,
+        'property_rate_motor': 400.0, 'violent_rate_all': 500.0, 'violent_rate_assault': 300.0,
+        'violent_rate_murder': 5.0, 'violent_rate_rape': 40.0, 'violent_rate_robbery': 155.0,
+        'property_total_all': 30000, 'property_total_burglary': 6000, 'property_total_larceny': 20000,
+        'property_total_motor': 4000, 'violent_total_all': 5000, 'violent_total_assault': 3000,
+        'violent_total_murder': 50, 'violent_total_rape': 400, 'violent_total_robbery': 1550,
+    }
+    record.update(overrides)
+    return record
+
+
+class BulkCreateTest(APITestCase):
+    """Test cases for POST /api/crime/bulk/."""
+
+    def setUp(self):
+        clear_caches()
+        self.url = reverse('crime-bulk')
+        self.client.post(self.url, [bulk_record('Texas', 2015)], format='json')
+        for state in ('Ohio', 'Utah', 'Iowa'):
+            State.objects.get_for_name(state)
+
+    def test_valid_records_are_created_and_errors_indexed(self):
+        """Test that one batch query set writes the valid rows and reports the rest by index."""
+        records = [bulk_record(state, 2016) for state in ('Texas', 'Ohio', 'Utah', 'Iowa')] + [
+            bulk_record('Texas', 2015),                          # already stored
+            bulk_record('Ohio', 2016),                           # repeated in the batch
+            bulk_record('Utah', 2017, property_total_all=99999),  # fails CrimeDataSerializer.validate
+            bulk_record('Utah', 1900),
+        ]
+        version = get_dataset_version()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, records, format='json')
+        self.assertLessEqual(len(queries), 6)
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 4)
+        self.assertEqual([error['index'] for error in response.data['errors']], [4, 5, 6, 7])
+        self.assertIn('Property crime totals', str(response.data['errors'][2]['errors']))
+        self.assertIn('year', response.data['errors'][3]['errors'])
+
+        self.assertEqual(CrimeData.objects.filter(year=2016).count(), 4)
+        record = CrimeData.objects.get(state__name='Iowa', year=2016)
+        self.assertEqual(record.row_hash, record.compute_row_hash())
+        self.assertGreater(get_dataset_version(), version)
+
+    def test_ndjson_body_and_rejections(self):
+        """Test NDJSON input, an all-invalid batch and a non-list body."""
+        body = '\n'.join(json.dumps(bulk_record(state, 2014)) for state in ('Ohio', 'CA')) + '\n\n'
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(CrimeData.objects.filter(state__name='California', year=2014).exists())
+
+        response = self.client.post(self.url, [bulk_record('Texas', 2015)], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, bulk_record('Texas', 2013), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, '{"state": ', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_batch_creates_no_states(self):
+        """Test that a batch rejected with 409 rolls back the states it would have added."""
+        with mock.patch.object(CrimeData.objects, 'bulk_create', side_effect=IntegrityError):
+            response = self.client.post(self.url, [bulk_record('Vermont', 2015)], format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(State.objects.filter(name='Vermont').exists())
+
+
+class BulkUpdateTest(APITestCase):
+    """Test cases for PATCH /api/crime/bulk/."""
+
+    def setUp(self):
+        clear_caches()
+        self.url = reverse('crime-bulk')
+        self.client.post(self.url, [bulk_record(state, year) for state in ('Texas', 'Ohio') for year in (2014, 2015)],
+                         format='json')
+
+    def test_corrections_are_applied_in_one_update(self):
+        """Test that valid corrections are written together and the rest reported by index."""
+        updates = [
+            {'state': 'Texas', 'year': 2014, 'violent_total_murder': 60, 'violent_rate_murder': 6.0},
+            {'state': 'oh', 'year': 2015, 'violent_total_murder': 70},
+            {'state': 'Texas', 'year': 2015, 'property_total_all': 10},  # breaks the totals check
+            {'state': 'Utah', 'year': 2015, 'population': 5},
+            {'state': 'Ohio', 'year': 2014, 'row_hash': 'x'},
+            {'state': 'Ohio', 'year': 2014, 'population': -1},
+        ]
+        version = get_dataset_version()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, updates, format='json')
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE')]), 1)
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [2, 3, 4, 5])
+        self.assertIn('population', response.data['errors'][3]['errors'])
+
+        texas = CrimeData.objects.get(state__name='Texas', year=2014)
+        self.assertEqual((texas.violent_total_murder, texas.violent_rate_murder), (60, 6.0))
+        self.assertEqual(texas.row_hash, texas.compute_row_hash())
+        self.assertEqual(texas.total_crimes, 30000 + 5000)
+        self.assertEqual(CrimeData.objects.get(state__name='Ohio', year=2015).violent_total_murder, 70)
+        self.assertEqual(CrimeData.objects.get(state__name='Texas', year=2015).property_total_all, 30000)
+        self.assertGreater(get_dataset_version(), version)
+
+    def test_all_rejected_updates_change_nothing(self):
+        """Test that a batch with no valid update returns 400 and leaves the version alone."""
+        version = get_dataset_version()
+        response = self.client.patch(self.url, [{'state': 'Texas', 'year': 2014}, {'year': 2014}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['errors'], {'non_field_errors': ['No fields to update.']})
+        self.assertEqual(get_dataset_version(), version)
@@ -7,6 +7,9 @@ router = DefaultRouter()
 router.register(r'crime', views.CrimeDataViewSet, basename='crime')
 
 urlpatterns = [
+    # Bulk export, ahead of the router so 'export' is not taken for a record id
+    path('api/crime/export/', views.export_crime_data, name='crime-export'),
+
     # ViewSet URLs (CRUD operations)
     path('api/', include(router.urls)),
 
@@ -15,6 +18,9 @@ urlpatterns = [
     path('api/crime-trends/<str:state_name>/', views.crime_trends, name='crime-trends'),
     path('api/compare-states/', views.compare_states, name='compare-states'),
     path('api/safest-states/', views.safest_states, name='safest-states'),
+    path('api/decade-comparison/', views.decade_comparison_all, name='decade-comparison-all'),
     path('api/decade-comparison/<str:state_name>/', views.decade_comparison, name='decade-comparison'),
     path('api/crime-type-analysis/', views.crime_type_analysis, name='crime-type-analysis'),
+    path('api/crime-matrix/', views.crime_matrix, name='crime-matrix'),
+    path('api/cache-stats/', views.cache_stats, name='cache-stats'),
 ]
@@ -1,14 +1,35 @@
+from itertools import chain, islice
+from operator import itemgetter
+
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, action
+from rest_framework.decorators import api_view, action, renderer_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Avg, Max, Min, Sum, Q
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Avg, Count, ExpressionWrapper, F, IntegerField, Sum
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from django.views.decorators.http import require_safe
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
+from .bulk import bulk_create_records, bulk_update_records
+from .cache import cache_statistics, cached_response, get_dataset_version
+from .export import EXPORT_FORMATS, export_stream
+from .engine import ENGINE_NUMPY, engine_for, get_dataset
+from .middleware import etag_exempt
 from .models import CrimeData
-from .serializers import CrimeDataSerializer, CrimeDataCreateSerializer, CrimeSummarySerializer
+from .pagination import KeysetPagination
+from .parsers import NDJSONParser
+from .renderers import COLUMNAR_RENDERER_CLASSES, StreamingJSONResponse, should_stream
+from .serializers import (
+    CrimeDataSerializer, CrimeDataBulkSerializer, CrimeDataCreateSerializer, CrimeSummarySerializer,
+    values_row_serializer,
+)
 from .forms import CrimeDataForm
+from .resolver import get_state_resolver
 
 
 def home_view(request):
@@ -29,6 +50,92 @@ def home_view(request):
     return render(request, 'crime_api/home.html', context)
 
 
+# Response fields of the serializers, used by the columnar engine
+SUMMARY_FIELDS = list(CrimeSummarySerializer().fields)
+DETAIL_FIELDS = list(CrimeDataSerializer().fields)
+
+FIELDS_PARAMETER = OpenApiParameter(
+    name='fields',
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    description='Comma-separated subset of record fields to return (e.g. state,year,violent_rate_murder)',
+    required=False,
+)
+
+
+def requested_fields(request, available=DETAIL_FIELDS):
+    """
+    Read the ?fields= sparse fieldset.
+
+    Returns the requested names in serializer order, or None when the
+    parameter is absent. Unknown names are rejected with a 400.
+    """
+    value = request.query_params.get('fields', '')
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    if not names:
+        return None
+    unknown = names.difference(available)
+    if unknown:
+        raise ValidationError({'fields': f'Unknown fields: {", ".join(sorted(unknown))}'})
+    return [name for name in available if name in names]
+
+
+def prune_queryset(queryset, fields):
+    """
+    Narrow a CrimeData queryset to the columns behind the given fields.
+
+    The year and state key are always loaded so ordering and cursors never
+    trigger deferred loads; the State row is only joined if 'state' is wanted.
+    """
+    columns = {'year', 'state'}
+    columns.update('state__name' if field == 'state' else field for field in fields)
+    if 'state' not in fields:
+        queryset = queryset.select_related(None)
+    return queryset.only(*columns)
+
+
+def filter_crime_data(queryset, params):
+    """Apply the state, year, year_from and year_to query filters shared by the list and export."""
+    state = params.get('state', None)
+    year = params.get('year', None)
+    year_from = params.get('year_from', None)
+    year_to = params.get('year_to', None)
+
+    if state:
+        queryset = queryset.filter(state_id__in=get_state_resolver().resolve(state))
+    if year:
+        queryset = queryset.filter(year=year)
+    if year_from:
+        queryset = queryset.filter(year__gte=year_from)
+    if year_to:
+        queryset = queryset.filter(year__lte=year_to)
+    return queryset
+
+
+def state_not_found_response(state_name):
+    """Return the 404 response for a state name that matches no data."""
+    return Response(
+        {'error': f'No data found for state: {state_name}'},
+        status=status.HTTP_404_NOT_FOUND
+    )
+
+
+def bulk_errors(errors):
+    """List bulk {index: detail} errors in body order."""
+    return [{'index': index, 'errors': errors[index]} for index in sorted(errors)]
+
+
+def bulk_status(written, errors, success_status):
+    """Return success_status, 207 if some records were rejected, or 400 if all were."""
+    if not errors:
+        return success_status
+    return status.HTTP_207_MULTI_STATUS if written else status.HTTP_400_BAD_REQUEST
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=[FIELDS_PARAMETER]),
+    retrieve=extend_schema(parameters=[FIELDS_PARAMETER]),
+)
 class CrimeDataViewSet(viewsets.ModelViewSet):
     """
     ViewSet for CrimeData model providing CRUD operations.
@@ -40,36 +147,167 @@ class CrimeDataViewSet(viewsets.ModelViewSet):
     - PUT /api/crime/{id}/ - Update crime data
     - DELETE /api/crime/{id}/ - Delete crime data
     """
-    queryset = CrimeData.objects.all()
+    queryset = CrimeData.objects.select_related('state')
     serializer_class = CrimeDataSerializer
 
     def get_serializer_class(self):
         """Use different serializer for create action."""
         if self.action == 'create':
             return CrimeDataCreateSerializer
-        elif self.action == 'list':
+        elif self.action == 'list' and not self.sparse_fields():
             return CrimeSummarySerializer
         return CrimeDataSerializer
 
+    def get_renderers(self):
+        """Offer the Arrow columnar format (?format=arrow) on the list."""
+        if self.action == 'list':
+            return [renderer() for renderer in COLUMNAR_RENDERER_CLASSES]
+        return super().get_renderers()
+
+    @extend_schema(
+        request=CrimeDataBulkSerializer(many=True),
+        responses={201: OpenApiTypes.OBJECT, 207: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        description='Create many records from a JSON array or NDJSON body.',
+    )
+    @action(detail=False, methods=['post'], url_path='bulk', parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        POST /api/crime/bulk/ - Create many records in one request.
+
+        Takes a JSON array or an NDJSON body (Content-Type:
+        application/x-ndjson) of up to BULK_MAX_RECORDS records with the
+        create fields. Every record is validated as on POST /api/crime/;
+        the valid ones are inserted in one transaction and the rest are
+        reported by their index in the body. Responds 201 when all records
+        were created, 207 when some were rejected, 400 when none were.
+        """
+        records, error_response = self.bulk_payload(request)
+        if error_response is not None:
+            return error_response
+
+        try:
+            created, errors = bulk_create_records(records)
+        except IntegrityError:
+            # Another writer stored one of the pairs since they were checked
+            return Response(
+                {'error': 'Records were written concurrently; retry the batch'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response({
+            'created': len(created),
+            'ids': [record.id for record in created],
+            'errors': bulk_errors(errors),
+        }, status=bulk_status(created, errors, status.HTTP_201_CREATED))
+
+    @extend_schema(
+        request=OpenApiTypes.OBJECT,
+        responses={200: OpenApiTypes.OBJECT, 207: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        description='Correct fields of many records, each addressed by state and year.',
+    )
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """
+        PATCH /api/crime/bulk/ - Correct many records in one request.
+
+        Takes a JSON array or NDJSON body of {state, year, field: value, ...}
+        updates. Only the given fields are validated and written, together
+        with a re-check of the cross-field rules against the stored values.
+        The target records are read in one query and the accepted changes
+        written with one bulk update; rejected updates are reported by their
+        index. Responds 200 when every update was applied, 207 when some
+        were rejected, 400 when none were.
+        """
+        updates, error_response = self.bulk_payload(request)
+        if error_response is not None:
+            return error_response
+
+        updated, errors = bulk_update_records(updates)
+        return Response({
+            'updated': len(updated),
+            'ids': [record.id for record in updated],
+            'errors': bulk_errors(errors),
+        }, status=bulk_status(updated, errors, status.HTTP_200_OK))
+
+    def bulk_payload(self, request):
+        """Return (records, None) for a valid bulk body, else (None, error response)."""
+        records = request.data
+        if not isinstance(records, list):
+            return None, Response(
+                {'error': 'Expected a JSON array or NDJSON body of records'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(records) > settings.BULK_MAX_RECORDS:
+            return None, Response(
+                {'error': f'At most {settings.BULK_MAX_RECORDS} records can be sent at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return records, None
+
+    def get_serializer(self, *args, **kwargs):
+        """Prune the serializer to the ?fields= sparse fieldset, if any."""
+        fields = self.sparse_fields()
+        if fields:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def sparse_fields(self):
+        """Return the ?fields= names for list and retrieve requests, else None."""
+        if self.action not in ('list', 'retrieve') or self.request is None:
+            return None
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = requested_fields(self.request)
+        return self._sparse_fields
+
+    @property
+    def paginator(self):
+        """Use keyset pagination when the request asks for ?paginate=cursor."""
+        if not hasattr(self, '_paginator') and self.request is not None:
+            if self.request.query_params.get('paginate') == 'cursor':
+                self._paginator = KeysetPagination()
+        return super().paginator
+
+    def list(self, request, *args, **kwargs):
+        """
+        List records through the values fast path.
+
+        Rows are fetched as tuples and serialized by position, giving the
+        same JSON as the ModelSerializer without building model instances.
+        The year and state key are appended to each row for keyset cursors.
+        Large keyset pages are streamed instead of encoded in one piece.
+        """
+        fields = self.sparse_fields()
+        reader = values_row_serializer(
+            self.get_serializer_class(), tuple(fields) if fields else None, ('year', 'state_id')
+        )
+        queryset = reader.values(self.filter_queryset(self.get_queryset()))
+
+        if isinstance(self.paginator, KeysetPagination):
+            self.paginator.key = itemgetter(-2, -1)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            if should_stream(request, len(page)):
+                # The page's row tuples are already in memory: the next and
+                # previous cursors come from its first and last rows and go
+                # out before them. Memory is bounded by max_page_size tuples;
+                # streaming only avoids holding every dict and the whole body.
+                envelope = self.get_paginated_response([]).data
+                del envelope['results']
+                return StreamingJSONResponse(envelope, 'results', map(reader.to_representation_row, page))
+            return self.get_paginated_response(reader.to_representation(page))
+        return Response(reader.to_representation(queryset))
+
     def get_queryset(self):
         """
         Filter queryset based on query parameters.
-        Supports filtering by state, year, and year range.
+        Supports filtering by state, year, and year range, and narrows the
+        selected columns to a ?fields= sparse fieldset.
         """
-        queryset = CrimeData.objects.all()
-        state = self.request.query_params.get('state', None)
-        year = self.request.query_params.get('year', None)
-        year_from = self.request.query_params.get('year_from', None)
-        year_to = self.request.query_params.get('year_to', None)
+        queryset = filter_crime_data(CrimeData.objects.select_related('state'), self.request.query_params)
 
-        if state:
-            queryset = queryset.filter(state__icontains=state)
-        if year:
-            queryset = queryset.filter(year=year)
-        if year_from:
-            queryset = queryset.filter(year__gte=year_from)
-        if year_to:
-            queryset = queryset.filter(year__lte=year_to)
+        fields = self.sparse_fields()
+        if fields:
+            queryset = prune_queryset(queryset, fields)
 
         return queryset
 
@@ -105,6 +343,7 @@ class CrimeDataViewSet(viewsets.ModelViewSet):
     description='Get states with crime rates above specified threshold.'
 )
 @api_view(['GET'])
+@cached_response('high_crime_states')
 def high_crime_states(request):
     """
     ENDPOINT 1: Get states with crime rates above specified threshold.
@@ -123,33 +362,67 @@ def high_crime_states(request):
     year = request.query_params.get('year', None)
     crime_type = request.query_params.get('crime_type', 'all')
 
-    queryset = CrimeData.objects.all()
-
-    if year:
-        queryset = queryset.filter(year=year)
-
     # Filter based on crime type
     if crime_type == 'violent':
-        queryset = queryset.filter(violent_rate_all__gte=threshold)
+        rate_field = 'violent_rate_all'
     elif crime_type == 'property':
-        queryset = queryset.filter(property_rate_all__gte=threshold)
+        rate_field = 'property_rate_all'
     else:
-        # Both violent and property crimes combined
-        queryset = [
-            record for record in queryset
-            if (record.violent_rate_all + record.property_rate_all) >= threshold
-        ]
+        # Both violent and property crimes combined (stored generated column)
+        rate_field = 'crime_rate_per_capita'
 
-    serializer = CrimeSummarySerializer(queryset, many=True)
+    if engine_for('high_crime_states') == ENGINE_NUMPY:
+        dataset = get_dataset()
+        results = dataset.records(dataset.threshold(rate_field, threshold, year or None), SUMMARY_FIELDS)
+    else:
+        queryset = CrimeData.objects.filter(**{f'{rate_field}__gte': threshold})
+        if year:
+            queryset = queryset.filter(year=year)
+        reader = values_row_serializer(CrimeSummarySerializer)
+        # One query: buffer up to STREAMING_MIN_ROWS rows to decide whether to stream
+        rows = reader.iterate(queryset, settings.STREAMING_CHUNK_SIZE)
+        head = list(islice(rows, settings.STREAMING_MIN_ROWS))
+        if should_stream(request, len(head)):
+            # Unbounded across all years: stream the rest straight off the
+            # cursor and count the rows as they are sent
+            return StreamingJSONResponse({
+                'threshold': threshold,
+                'crime_type': crime_type,
+                'year': year if year else 'all years',
+            }, 'results', chain(head, rows), count_key='count')
+        results = head + list(rows)
+
+    # count follows the results, as in the streamed form
     return Response({
         'threshold': threshold,
         'crime_type': crime_type,
         'year': year if year else 'all years',
-        'count': len(serializer.data),
-        'results': serializer.data
+        'results': results,
+        'count': len(results),
     })
 
 
+# Columns read by crime_trends, in the order trend_statistics expects
+TREND_FIELDS = ('year', 'violent_rate_all', 'property_rate_all', 'violent_total_murder', 'population')
+
+
+def trend_statistics(rows):
+    """
+    Compute crime_trends statistics from (year, violent rate, property rate,
+    murders, population) tuples in one pass over already-fetched rows.
+    """
+    count = len(rows)
+    _, violent_rates, property_rates, murders, populations = zip(*rows)
+    return {
+        'avg_violent_rate': sum(violent_rates) / count,
+        'avg_property_rate': sum(property_rates) / count,
+        'max_violent_rate': max(violent_rates),
+        'min_violent_rate': min(violent_rates),
+        'total_murders': sum(murders),
+        'avg_population': sum(populations) / count,
+    }
+
+
 @extend_schema(
     parameters=[
         OpenApiParameter(
@@ -173,11 +446,22 @@ def high_crime_states(request):
             description='End year',
             required=False,
         ),
+        OpenApiParameter(
+            name='statistics_only',
+            type=OpenApiTypes.BOOL,
+            location=OpenApiParameter.QUERY,
+            description='Return only the summary statistics, without per-year data',
+            required=False,
+            default=False,
+        ),
+        FIELDS_PARAMETER,
     ],
     responses={200: CrimeDataSerializer(many=True)},
     description='Analyze crime trends for a specific state over time.'
 )
 @api_view(['GET'])
+@renderer_classes(COLUMNAR_RENDERER_CLASSES)
+@cached_response('crime_trends')
 def crime_trends(request, state_name):
     """
     ENDPOINT 2: Analyze crime trends for a specific state over time.
@@ -188,51 +472,85 @@ def crime_trends(request, state_name):
     Query Parameters:
     - year_from: Start year (optional)
     - year_to: End year (optional)
+    - statistics_only: Omit the per-year data (optional, default: false)
+    - fields: Comma-separated fields to include in the yearly data (optional)
 
     Example: /api/crime-trends/California/?year_from=2000&year_to=2019
 
     This endpoint is interesting because it shows how crime has evolved over
     decades in a state, useful for evaluating policy effectiveness.
+
+    The state name is resolved in memory (abbreviations, prefixes and close
+    spellings are accepted) and the response echoes the canonical name. A
+    single ordered query is then run; its rows drive the 404 check, the year
+    range, the statistics and the yearly data.
     """
     year_from = request.query_params.get('year_from', None)
     year_to = request.query_params.get('year_to', None)
+    statistics_only = request.query_params.get('statistics_only', '').lower() in ('1', 'true', 'yes')
+    fields = requested_fields(request)
+
+    resolver = get_state_resolver()
+    state_id = resolver.resolve_one(state_name)
+    if state_id is None:
+        return state_not_found_response(state_name)
+
+    if engine_for('crime_trends') == ENGINE_NUMPY:
+        dataset = get_dataset()
+        indices = dataset.state_rows(state_id, year_from or None, year_to or None)
+        if not len(indices):
+            return state_not_found_response(state_name)
+        years = dataset.year[indices]
+        response_data = {
+            'state': resolver.names[state_id],
+            'year_range': f"{years[0]} to {years[-1]}",
+            'statistics': dataset.trend_statistics(indices),
+            'data_points': len(indices),
+        }
+        if not statistics_only:
+            response_data['yearly_data'] = dataset.records(indices, fields or DETAIL_FIELDS)
+        return Response(response_data)
 
-    queryset = CrimeData.objects.filter(state__iexact=state_name).order_by('year')
+    queryset = CrimeData.objects.filter(state_id=state_id).order_by('year')
 
     if year_from:
         queryset = queryset.filter(year__gte=year_from)
     if year_to:
         queryset = queryset.filter(year__lte=year_to)
 
-    if not queryset.exists():
-        return Response(
-            {'error': f'No data found for state: {state_name}'},
-            status=status.HTTP_404_NOT_FOUND
-        )
+    if statistics_only:
+        records = None
+        rows = list(queryset.values_list(*TREND_FIELDS))
+    else:
+        # The trend columns ride along after the output fields of each row
+        reader = values_row_serializer(CrimeDataSerializer, tuple(fields) if fields else None, TREND_FIELDS)
+        records = list(reader.values(queryset))
+        rows = [record[-len(TREND_FIELDS):] for record in records]
+
+    if not rows:
+        return state_not_found_response(state_name)
+
+    response_data = {
+        'state': resolver.names[state_id],
+        'year_range': f"{rows[0][0]} to {rows[-1][0]}",
+        'statistics': trend_statistics(rows),
+        'data_points': len(rows),
+    }
+    if records is not None:
+        response_data['yearly_data'] = reader.to_representation(records)
 
-    # Calculate trend statistics
-    stats = queryset.aggregate(
-        avg_violent_rate=Avg('violent_rate_all'),
-        avg_property_rate=Avg('property_rate_all'),
-        max_violent_rate=Max('violent_rate_all'),
-        min_violent_rate=Min('violent_rate_all'),
-        total_murders=Sum('violent_total_murder'),
-        avg_population=Avg('population')
-    )
+    return Response(response_data)
 
-    serializer = CrimeDataSerializer(queryset, many=True)
 
-    return Response({
-        'state': state_name,
-        'year_range': f"{queryset.first().year} to {queryset.last().year}",
-        'statistics': stats,
-        'data_points': len(serializer.data),
-        'yearly_data': serializer.data
-    })
+# Columns the compare_states summary is built from
+COMPARISON_FIELDS = (
+    'state', 'population', 'violent_rate_all', 'property_rate_all', 'crime_rate_per_capita', 'violent_rate_murder',
+)
 
 
 @extend_schema(
     parameters=[
+        FIELDS_PARAMETER,
         OpenApiParameter(
             name='states',
             type=OpenApiTypes.STR,
@@ -260,6 +578,8 @@ def crime_trends(request, state_name):
     description='Compare crime statistics across multiple states for a specific year.'
 )
 @api_view(['GET'])
+@renderer_classes(COLUMNAR_RENDERER_CLASSES)
+@cached_response('compare_states')
 def compare_states(request):
     """
     ENDPOINT 3: Compare crime statistics across multiple states for a specific year.
@@ -268,11 +588,15 @@ def compare_states(request):
     - states: Comma-separated list of state names (required)
     - year: Year to compare (required)
     - metric: Specific crime metric to compare (optional, default: all)
+    - fields: Comma-separated fields to include in the detailed data (optional)
 
     Example: /api/compare-states/?states=California,Texas,New York&year=2015
 
     This endpoint is interesting for understanding regional crime disparities
     and comparing different state approaches to law enforcement.
+
+    Each name is resolved in memory, so abbreviations such as 'CA' work and
+    the query filters on state keys only.
     """
     states_param = request.query_params.get('states', '')
     year = request.query_params.get('year', None)
@@ -284,25 +608,31 @@ def compare_states(request):
         )
 
     states = [s.strip() for s in states_param.split(',')]
+    fields = requested_fields(request)
+    # A sparse fieldset narrows detailed_data; the comparison still needs its columns
+    needed = DETAIL_FIELDS
+    if fields:
+        needed = [field for field in DETAIL_FIELDS if field in fields or field in COMPARISON_FIELDS]
+
+    resolver = get_state_resolver()
+    state_ids = {resolver.resolve_one(state) for state in states} - {None}
+    if engine_for('compare_states') == ENGINE_NUMPY:
+        dataset = get_dataset()
+        records = dataset.records(dataset.compare(state_ids, year), needed)
+    else:
+        queryset = CrimeData.objects.filter(state_id__in=state_ids, year=year)
+        reader = values_row_serializer(CrimeDataSerializer, tuple(needed))
+        records = reader.to_representation(reader.values(queryset))
 
-    # Build query for multiple states
-    query = Q()
-    for state in states:
-        query |= Q(state__iexact=state)
-
-    queryset = CrimeData.objects.filter(query, year=year)
-
-    if not queryset.exists():
+    if not records:
         return Response(
             {'error': f'No data found for specified states in year {year}'},
             status=status.HTTP_404_NOT_FOUND
         )
 
-    serializer = CrimeDataSerializer(queryset, many=True)
-
     # Calculate comparison metrics
     comparison = []
-    for data in serializer.data:
+    for data in records:
         comparison.append({
             'state': data['state'],
             'population': data['population'],
@@ -316,7 +646,7 @@ def compare_states(request):
         'year': year,
         'states_compared': len(comparison),
         'comparison': comparison,
-        'detailed_data': serializer.data
+        'detailed_data': [{field: data[field] for field in fields} for data in records] if fields else records
     })
 
 
@@ -354,6 +684,7 @@ def compare_states(request):
     description='Get the safest states based on lowest crime rates.'
 )
 @api_view(['GET'])
+@cached_response('safest_states')
 def safest_states(request):
     """
     ENDPOINT 4: Get the safest states based on lowest crime rates.
@@ -378,29 +709,125 @@ def safest_states(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    queryset = CrimeData.objects.filter(year=year)
-
     # Sort based on crime type
     if crime_type == 'violent':
-        queryset = queryset.order_by('violent_rate_all')[:limit]
+        rate_field = 'violent_rate_all'
     elif crime_type == 'property':
-        queryset = queryset.order_by('property_rate_all')[:limit]
+        rate_field = 'property_rate_all'
     else:
-        # Sort by combined rate
-        results = list(queryset)
-        results.sort(key=lambda x: x.crime_rate_per_capita)
-        queryset = results[:limit]
+        # Sort by combined rate, served by the (year, crime_rate_per_capita) index
+        rate_field = 'crime_rate_per_capita'
 
-    serializer = CrimeSummarySerializer(queryset, many=True)
+    if engine_for('safest_states') == ENGINE_NUMPY:
+        dataset = get_dataset()
+        results = dataset.records(dataset.top(dataset.year_rows(year), rate_field, limit), SUMMARY_FIELDS)
+    else:
+        queryset = CrimeData.objects.filter(year=year).order_by(rate_field, 'state__name')[:limit]
+        reader = values_row_serializer(CrimeSummarySerializer)
+        results = reader.to_representation(reader.values(queryset))
 
     return Response({
         'year': year,
         'crime_type': crime_type,
         'limit': limit,
-        'safest_states': serializer.data
+        'safest_states': results
     })
 
 
+# Named bucket widths accepted by the decade comparison endpoints
+BUCKET_WIDTHS = {'decade': 10, '5-year': 5}
+
+BUCKET_PARAMETER = OpenApiParameter(
+    name='bucket',
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    description="Bucket width: 'decade', '5-year', or a number of years (default: decade)",
+    required=False,
+    default='decade',
+    examples=[
+        OpenApiExample('Decades', value='decade'),
+        OpenApiExample('Five years', value='5-year'),
+        OpenApiExample('Custom width', value='3'),
+    ]
+)
+
+
+def parse_bucket_width(request):
+    """
+    Read the bucket query parameter as a width in years.
+
+    Returns None if the value is not a known name or a number from 1 to 100.
+    """
+    bucket = request.query_params.get('bucket', 'decade').strip().lower()
+    if bucket in BUCKET_WIDTHS:
+        return BUCKET_WIDTHS[bucket]
+    try:
+        width = int(bucket)
+    except ValueError:
+        return None
+    return width if 1 <= width <= 100 else None
+
+
+def bucket_label(start, width):
+    """Label a bucket: '1990s' for decades, '1990-1994' otherwise."""
+    if width == 10:
+        return f"{start}s"
+    if width == 1:
+        return str(start)
+    return f"{start}-{start + width - 1}"
+
+
+def bucket_statistics(queryset, width):
+    """
+    Aggregate a queryset into per-state year buckets in a single query.
+
+    Buckets are computed in the database as (year / width) * width using
+    integer division, then grouped with AVG/SUM/COUNT. Returns
+    {state: {label: stats}} with buckets in chronological order.
+    """
+    rows = (
+        queryset
+        .annotate(bucket=ExpressionWrapper(F('year') / width * width, output_field=IntegerField()))
+        .values('state__name', 'bucket')
+        .annotate(
+            avg_violent_rate=Avg('violent_rate_all'),
+            avg_property_rate=Avg('property_rate_all'),
+            total_murders=Sum('violent_total_murder'),
+            avg_population=Avg('population'),
+            years_included=Count('id'),
+        )
+        .order_by('state__name', 'bucket')
+    )
+
+    statistics = {}
+    for row in rows:
+        state_buckets = statistics.setdefault(row['state__name'], {})
+        state_buckets[bucket_label(row['bucket'], width)] = {
+            'avg_violent_rate': row['avg_violent_rate'],
+            'avg_property_rate': row['avg_property_rate'],
+            'total_murders': row['total_murders'],
+            'avg_population': row['avg_population'],
+            'years_included': row['years_included'],
+        }
+    return statistics
+
+
+def columnar_bucket_statistics(groups, width):
+    """Arrange the columnar engine's bucket groups like bucket_statistics."""
+    statistics = {}
+    for state, bucket, stats in groups:
+        statistics.setdefault(state, {})[bucket_label(bucket, width)] = stats
+    return statistics
+
+
+def invalid_bucket_response():
+    """Return the 400 response for an unusable bucket parameter."""
+    return Response(
+        {'error': "Invalid bucket. Use 'decade', '5-year', or a number of years from 1 to 100"},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
 @extend_schema(
     parameters=[
         OpenApiParameter(
@@ -410,11 +837,13 @@ def safest_states(request):
             description='Name of the state',
             required=True,
         ),
+        BUCKET_PARAMETER,
     ],
     responses={200: CrimeDataSerializer(many=True)},
     description='Compare crime statistics across decades for a specific state.'
 )
 @api_view(['GET'])
+@cached_response('decade_comparison')
 def decade_comparison(request, state_name):
     """
     ENDPOINT 5: Compare crime statistics across decades for a specific state.
@@ -422,56 +851,71 @@ def decade_comparison(request, state_name):
     URL Parameter:
     - state_name: Name of the state
 
-    Example: /api/decade-comparison/Florida/
+    Query Parameters:
+    - bucket: 'decade', '5-year', or a width in years (default: decade)
+
+    Example: /api/decade-comparison/Florida/?bucket=5-year
 
     This endpoint is interesting for long-term trend analysis and understanding
     how crime patterns have changed over multiple decades.
     """
-    queryset = CrimeData.objects.filter(state__iexact=state_name).order_by('year')
+    width = parse_bucket_width(request)
+    if width is None:
+        return invalid_bucket_response()
 
-    if not queryset.exists():
-        return Response(
-            {'error': f'No data found for state: {state_name}'},
-            status=status.HTTP_404_NOT_FOUND
-        )
+    state_id = get_state_resolver().resolve_one(state_name)
+    if state_id is None:
+        return state_not_found_response(state_name)
 
-    # Group data by decades
-    decades = {}
-    for record in queryset:
-        decade = (record.year // 10) * 10
-        decade_label = f"{decade}s"
-
-        if decade_label not in decades:
-            decades[decade_label] = {
-                'violent_rates': [],
-                'property_rates': [],
-                'murder_totals': [],
-                'populations': []
-            }
-
-        decades[decade_label]['violent_rates'].append(record.violent_rate_all)
-        decades[decade_label]['property_rates'].append(record.property_rate_all)
-        decades[decade_label]['murder_totals'].append(record.violent_total_murder)
-        decades[decade_label]['populations'].append(record.population)
-
-    # Calculate averages for each decade
-    decade_stats = {}
-    for decade, data in decades.items():
-        decade_stats[decade] = {
-            'avg_violent_rate': sum(data['violent_rates']) / len(data['violent_rates']),
-            'avg_property_rate': sum(data['property_rates']) / len(data['property_rates']),
-            'total_murders': sum(data['murder_totals']),
-            'avg_population': sum(data['populations']) / len(data['populations']),
-            'years_included': len(data['violent_rates'])
-        }
+    if engine_for('decade_comparison') == ENGINE_NUMPY:
+        statistics = columnar_bucket_statistics(get_dataset().bucket_groups(width, state_id), width)
+    else:
+        statistics = bucket_statistics(CrimeData.objects.filter(state_id=state_id), width)
+    if not statistics:
+        return state_not_found_response(state_name)
 
+    state, decade_stats = next(iter(statistics.items()))
     return Response({
-        'state': state_name,
+        'state': state,
+        'bucket_width': width,
         'decades_analyzed': len(decade_stats),
         'decade_statistics': decade_stats
     })
 
 
+@extend_schema(
+    parameters=[BUCKET_PARAMETER],
+    description='Compare crime statistics across decades for every state in one query.'
+)
+@api_view(['GET'])
+@cached_response('decade_comparison_all')
+def decade_comparison_all(request):
+    """
+    Compare crime statistics across decades for every state at once.
+
+    Query Parameters:
+    - bucket: 'decade', '5-year', or a width in years (default: decade)
+
+    Example: /api/decade-comparison/?bucket=decade
+
+    Returns the same per-bucket statistics as the single-state endpoint,
+    keyed by state, from one grouped query.
+    """
+    width = parse_bucket_width(request)
+    if width is None:
+        return invalid_bucket_response()
+
+    if engine_for('decade_comparison_all') == ENGINE_NUMPY:
+        statistics = columnar_bucket_statistics(get_dataset().bucket_groups(width), width)
+    else:
+        statistics = bucket_statistics(CrimeData.objects.all(), width)
+    return Response({
+        'bucket_width': width,
+        'states_analyzed': len(statistics),
+        'decade_statistics': statistics
+    })
+
+
 @extend_schema(
     parameters=[
         OpenApiParameter(
@@ -518,6 +962,7 @@ def decade_comparison(request, state_name):
     description='Analyze specific crime types across all states for a given year.'
 )
 @api_view(['GET'])
+@cached_response('crime_type_analysis')
 def crime_type_analysis(request):
     """
     ENDPOINT 6: Analyze specific crime types across all states for a given year.
@@ -563,23 +1008,31 @@ def crime_type_analysis(request):
         )
 
     rate_field, total_field = crime_field_map[crime_type]
-
-    queryset = CrimeData.objects.filter(year=year)
-
-    # Sort by rate or total
-    if sort_by == 'total':
-        queryset = queryset.order_by(f'-{total_field}')[:limit]
+    sort_field = total_field if sort_by == 'total' else rate_field
+
+    if engine_for('crime_type_analysis') == ENGINE_NUMPY:
+        dataset = get_dataset()
+        indices = dataset.top(dataset.year_rows(year), sort_field, limit, descending=True)
+        rows = [
+            (row['state'], row['population'], row[rate_field], row[total_field])
+            for row in dataset.records(indices, ['state', 'population', rate_field, total_field])
+        ]
     else:
-        queryset = queryset.order_by(f'-{rate_field}')[:limit]
+        queryset = (
+            CrimeData.objects.filter(year=year)
+            .order_by(f'-{sort_field}', 'state__name')
+            .values_list('state__name', 'population', rate_field, total_field)[:limit]
+        )
+        rows = list(queryset)
 
     # Build response with specific crime data
     results = []
-    for record in queryset:
+    for state, population, rate, total in rows:
         results.append({
-            'state': record.state,
-            'population': record.population,
-            f'{crime_type}_rate': getattr(record, rate_field),
-            f'{crime_type}_total': getattr(record, total_field)
+            'state': state,
+            'population': population,
+            f'{crime_type}_rate': rate,
+            f'{crime_type}_total': total
         })
 
     return Response({
@@ -589,3 +1042,178 @@ def crime_type_analysis(request):
         'states_analyzed': len(results),
         'results': results
     })
+
+
+# Fields crime_matrix can lay out: every stored number plus the generated columns
+MATRIX_METRICS = [field for field in DETAIL_FIELDS if field not in ('id', 'state', 'year')]
+
+
+def build_matrix(rows):
+    """
+    Lay (state, year, value) triples ordered by state and year out as a
+    state x year grid, with None where a state has no row for a year.
+    """
+    states = list(dict.fromkeys(state for state, _, _ in rows))
+    years = sorted({year for _, year, _ in rows})
+    state_positions = {state: position for position, state in enumerate(states)}
+    year_positions = {year: position for position, year in enumerate(years)}
+
+    values = [[None] * len(years) for _ in states]
+    for state, year, value in rows:
+        values[state_positions[state]][year_positions[year]] = value
+    return states, years, values
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            name='metric',
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description='Field to lay out',
+            required=False,
+            default='crime_rate_per_capita',
+            enum=MATRIX_METRICS,
+        ),
+        OpenApiParameter(
+            name='states',
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description='Comma-separated list of state names (default: every state)',
+            required=False,
+        ),
+        OpenApiParameter(
+            name='year_from',
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            description='First year to include',
+            required=False,
+        ),
+        OpenApiParameter(
+            name='year_to',
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            description='Last year to include',
+            required=False,
+        ),
+    ],
+    description='One metric for every state and year as a compact state x year matrix.'
+)
+@api_view(['GET'])
+@cached_response('crime_matrix')
+def crime_matrix(request):
+    """
+    Return one metric as a state x year matrix, e.g. for heatmaps.
+
+    Query Parameters:
+    - metric: Any rate or total field, population, total_crimes or
+              crime_rate_per_capita (default: 'crime_rate_per_capita')
+    - states: Comma-separated list of state names (optional)
+    - year_from, year_to: Year range (optional)
+
+    Example: /api/crime-matrix/?metric=violent_rate_murder&year_from=2000
+
+    values[i][j] is the metric for states[i] in years[j], or null where
+    there is no record. The matrix comes from one narrow query (or the
+    columnar engine) instead of thousands of serialized records.
+    """
+    metric = request.query_params.get('metric', 'crime_rate_per_capita')
+    states_param = request.query_params.get('states', '')
+    year_from = request.query_params.get('year_from', None)
+    year_to = request.query_params.get('year_to', None)
+
+    if metric not in MATRIX_METRICS:
+        return Response(
+            {'error': f'Invalid metric. Must be one of: {", ".join(MATRIX_METRICS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    state_ids = None
+    if states_param:
+        resolver = get_state_resolver()
+        state_ids = {resolver.resolve_one(state.strip()) for state in states_param.split(',')} - {None}
+
+    if engine_for('crime_matrix') == ENGINE_NUMPY:
+        rows = get_dataset().matrix_rows(metric, state_ids, year_from or None, year_to or None)
+    else:
+        queryset = CrimeData.objects.all()
+        if state_ids is not None:
+            queryset = queryset.filter(state_id__in=state_ids)
+        if year_from:
+            queryset = queryset.filter(year__gte=year_from)
+        if year_to:
+            queryset = queryset.filter(year__lte=year_to)
+        rows = list(queryset.order_by('state__name', 'year').values_list('state__name', 'year', metric))
+
+    if not rows:
+        return Response(
+            {'error': 'No data found for the specified states and years'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    states, years, values = build_matrix(rows)
+    return Response({
+        'metric': metric,
+        'states': states,
+        'years': years,
+        'values': values,
+    })
+
+
+@require_safe
+def export_crime_data(request):
+    """
+    Stream the crime data table as CSV or NDJSON in a single response.
+
+    Query Parameters:
+    - format: 'csv' (default) or 'ndjson'
+    - compress: 'gzip' to download a gzipped file
+    - state, year, year_from, year_to: the same filters as /api/crime/
+
+    Example: /api/crime/export/?format=ndjson&year_from=2000&compress=gzip
+
+    Rows are read from a server-side cursor and encoded in chunks, so one
+    request replaces paging through the list endpoint without the whole
+    result ever being held in memory. This is a plain Django view because
+    DRF reserves ?format= for choosing its renderer.
+    """
+    export_format = request.GET.get('format', 'csv')
+    compress = request.GET.get('compress', '')
+    if export_format not in EXPORT_FORMATS or compress not in ('', 'gzip'):
+        return JsonResponse(
+            {'error': f"format must be one of {', '.join(EXPORT_FORMATS)} and compress must be gzip"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        queryset = filter_crime_data(CrimeData.objects.all(), request.GET)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid filter value'}, status=status.HTTP_400_BAD_REQUEST)
+
+    reader = values_row_serializer(CrimeDataSerializer)
+    rows = reader.values(queryset).iterator(chunk_size=settings.STREAMING_CHUNK_SIZE)
+    chunks, content_type, filename = export_stream(
+        export_format, reader.fields, rows, settings.STREAMING_CHUNK_SIZE, compress=bool(compress)
+    )
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@etag_exempt
+@extend_schema(
+    description='Hit and miss counters of the analytical response cache, per endpoint.'
+)
+@api_view(['GET'])
+def cache_stats(request):
+    """
+    Report response cache effectiveness.
+
+    Returns the current dataset version and, for every cached analytical
+    endpoint, how many requests were served from the cache (hits) and how
+    many had to query the database (misses).
+    """
+    return Response({
+        'dataset_version': get_dataset_version(),
+        'endpoints': cache_statistics(),
+    })
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'crime_api.middleware.DatasetETagMiddleware',
 ]
 
 ROOT_URLCONF = 'rest_api.urls'
@@ -132,7 +134,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'crime_api.renderers.FastJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
@@ -141,6 +143,57 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Cache Configuration
+# Both caches must be shared by every worker process and by management commands,
+# so they default to file-based caches; point the *_BACKEND/*_LOCATION variables
+# at a shared server (e.g. django.core.cache.backends.redis.RedisCache) across hosts.
+# 'default' holds the analytical responses and may evict them freely. 'dataset'
+# holds only the dataset version and the hit/miss counters, a few dozen keys, so
+# it never reaches MAX_ENTRIES and culls the version; on a cache server, use one
+# that does not evict keys stored without a timeout.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'crime_api_cache')),
+    },
+    'dataset': {
+        'BACKEND': os.environ.get('DATASET_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get(
+            'DATASET_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'crime_api_dataset')
+        ),
+    },
+}
+
+# Runs the tests against private in-memory caches (see rest_api/test_runner.py)
+TEST_RUNNER = 'rest_api.test_runner.PrivateCacheTestRunner'
+
+# Seconds an analytical response stays cached; writes invalidate entries sooner
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '3600'))
+
+# Analytics engine per endpoint: 'orm' (default) or 'numpy' for the in-memory
+# columnar engine. ANALYTICS_ENGINE sets the default and ANALYTICS_ENGINES
+# overrides single endpoints, e.g. "safest_states=numpy,crime_trends=orm".
+ANALYTICS_ENGINE = os.environ.get('ANALYTICS_ENGINE', 'orm')
+ANALYTICS_ENGINES = dict(
+    item.strip().split('=', 1) for item in os.environ.get('ANALYTICS_ENGINES', '').split(',') if item.strip()
+)
+
+# Directory for the columnar engine's shared, memory-mapped snapshot. Unset keeps
+# a private in-memory copy per process; use tmpfs (e.g. /dev/shm/crime_api_engine)
+# so gunicorn workers share one copy.
+ENGINE_SNAPSHOT_DIR = os.environ.get('ENGINE_SNAPSHOT_DIR') or None
+
+# Similarity cutoff (0-1) for the state name resolver's edit-distance fallback; 0 disables it
+STATE_RESOLVER_FUZZY_CUTOFF = float(os.environ.get('STATE_RESOLVER_FUZZY_CUTOFF', '0.8'))
+
+# JSON results of at least STREAMING_MIN_ROWS rows are streamed rather than built
+# in memory, encoding STREAMING_CHUNK_SIZE rows at a time from a queryset iterator
+STREAMING_MIN_ROWS = int(os.environ.get('STREAMING_MIN_ROWS', '1000'))
+STREAMING_CHUNK_SIZE = int(os.environ.get('STREAMING_CHUNK_SIZE', '500'))
+
+# Largest number of records accepted by one POST /api/crime/bulk/ request
+BULK_MAX_RECORDS = int(os.environ.get('BULK_MAX_RECORDS', '10000'))
+
 # DRF Spectacular Configuration (OpenAPI/Swagger)
 SPECTACULAR_SETTINGS = {
     'TITLE': 'US Crime Statistics REST API',
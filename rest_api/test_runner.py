@@ -0,0 +1,30 @@
+"""
+Test runner that keeps the suite away from the shared caches.
+
+Tests clear the cache between cases, so they run against private
+in-memory caches instead of the file caches a running development server
+also uses.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+TEST_CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'crime_api_tests_{alias}',
+    }
+    for alias in ('default', 'dataset')
+}
+
+
+class PrivateCacheTestRunner(DiscoverRunner):
+    """DiscoverRunner with CACHES overridden for the whole run."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_override = override_settings(CACHES=TEST_CACHES)
+        self.cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_override.disable()
+        super().teardown_test_environment(**kwargs)
@@ -17,15 +17,16 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from crime_api import views as crime_views
+from crime_api.middleware import etag_exempt
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
 urlpatterns = [
     path('', crime_views.home_view, name='home'),
     path('admin/', admin.site.urls),
-    # OpenAPI/Swagger Documentation
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    # OpenAPI/Swagger Documentation (changes with the code, not the data)
+    path('api/schema/', etag_exempt(SpectacularAPIView.as_view()), name='schema'),
+    path('api/docs/', etag_exempt(SpectacularSwaggerView.as_view(url_name='schema')), name='swagger-ui'),
+    path('api/redoc/', etag_exempt(SpectacularRedocView.as_view(url_name='schema')), name='redoc'),
     # API Endpoints
     path('', include('crime_api.urls')),
 ]